@@ -3,10 +3,25 @@ All Questions Viewer - Shows both real and generated questions
 Simple interface to view all questions at once
 """
 import streamlit as st
-import json
+import copy
+import hashlib
+import math
 import os
-import time
-from typing import List, Dict, Any
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import orjson
+
+sys.path.append('src')
+from src.question_generator import DZIQuestionGenerator, SubjectArea
+
+try:
+    from src.simple_rag_generator import SimpleRAGGenerator
+except ImportError:
+    SimpleRAGGenerator = None
 
 # Set page config
 st.set_page_config(
@@ -16,148 +31,247 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        color: #1f77b4;
-        margin-bottom: 2rem;
-    }
-    .question-box {
-        background-color: #ffffff;
-        padding: 20px;
-        border-radius: 8px;
-        margin: 15px 0;
-        border: 1px solid #e0e0e0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .real-matura-tag {
-        background-color: #e8f4fd;
-        color: #1f77b4;
-        padding: 4px 8px;
-        border-radius: 4px;
-        font-size: 12px;
-        font-weight: bold;
-        display: inline-block;
-        margin: 5px 0;
-    }
-    .generated-tag {
-        background-color: #f0f8e8;
-        color: #2e7d32;
-        padding: 4px 8px;
-        border-radius: 4px;
-        font-size: 12px;
-        font-weight: bold;
-        display: inline-block;
-        margin: 5px 0;
-    }
-    .question-number {
-        font-size: 18px;
-        font-weight: bold;
-        color: #1f77b4;
-        margin-bottom: 10px;
-    }
-    .question-text {
-        font-size: 16px;
-        line-height: 1.5;
-        margin-bottom: 15px;
-    }
-    .options {
-        margin: 10px 0;
-    }
-    .option {
-        margin: 5px 0;
-        padding: 5px 0;
-    }
-    .correct-answer {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 8px;
-        border-radius: 4px;
-        margin: 10px 0;
-        border-left: 4px solid #28a745;
+REAL_QUESTION_FILES = (
+    "data/matura_21_05_2025.json",
+    "data/matura_2025_avgust.json"
+)
+
+def _qkey(q):
+    """Canonical duplicate-detection key: question text and options (order doesn't matter)
+    
+    The normalized fields are stored on the dict the first time, so later
+    dedup passes over the same question don't allocate new strings.
+    """
+    if '_norm_question' not in q:
+        q['_norm_question'] = q.get('question', '').strip().lower()
+        q['_norm_options'] = tuple(sorted(opt.strip().lower() for opt in q.get('options', [])))
+    return (q['_norm_question'], q['_norm_options'])
+
+def _correct_set(correct_answer):
+    """Frozenset of accepted answers; correct_answer may be a string or a list"""
+    if isinstance(correct_answer, str):
+        return frozenset([correct_answer])
+    return frozenset(correct_answer or [])
+
+def _correct_answers(q):
+    """Precomputed accepted answers, computed on the fly for dicts from other sources"""
+    if '_correct_set' not in q:
+        q['_correct_set'] = _correct_set(q.get('correct_answer'))
+    return q['_correct_set']
+
+def _public_fields(q):
+    """Drop derived underscore fields before a question is serialized"""
+    return {k: v for k, v in q.items() if not k.startswith('_')}
+
+def _to_dict(q, subject):
+    """Convert a generated Question object to the dict format used by the app"""
+    return {
+        'question': q.question_text,
+        'options': q.options,
+        'correct_answer': q.correct_answer,
+        'subject': subject,
+        'difficulty': q.difficulty,
+        'points': q.points,
+        'type': 'multiple_choice',
+        '_correct_set': _correct_set(q.correct_answer)
     }
-</style>
-""", unsafe_allow_html=True)
 
-def load_real_questions():
-    """Load real matura questions from JSON files"""
-    questions = []
+def get_real_files_mtimes():
+    """Modification times of the real question files, used as a cache key"""
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else 0.0 for p in REAL_QUESTION_FILES)
+
+@st.cache_data(show_spinner=False)
+def load_real_questions(file_mtimes: tuple = ()):
+    """Load real matura questions from JSON files
     
-    json_files = [
-        "data/matura_21_05_2025.json",
-        "data/matura_2025_avgust.json"
-    ]
+    Returns a (questions, errors) tuple so the result stays cacheable;
+    errors are rendered by the caller. file_mtimes only invalidates the cache.
+    """
+    questions = []
+    errors = []
     
-    for file_path in json_files:
+    for file_path in REAL_QUESTION_FILES:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    questions.extend(data)
-                elif isinstance(data, dict) and 'questions' in data:
-                    questions.extend(data['questions'])
-                else:
-                    questions.append(data)
+            data = orjson.loads(Path(file_path).read_bytes())
+            if isinstance(data, list):
+                questions.extend(data)
+            elif isinstance(data, dict) and 'questions' in data:
+                questions.extend(data['questions'])
+            else:
+                questions.append(data)
         except Exception as e:
-            st.error(f"❌ Error loading {file_path}: {e}")
+            errors.append(f"❌ Error loading {file_path}: {e}")
     
     # Remove duplicates from real questions too
     unique_questions = []
     seen_questions = set()
     
     for q in questions:
-        # Create a unique identifier for the question
-        question_text = q.get('question', '').strip().lower()
-        options = sorted([opt.strip().lower() for opt in q.get('options', [])])
-        question_id = f"{question_text}_{'_'.join(options)}"
+        question_id = _qkey(q)
         
         if question_id not in seen_questions:
             seen_questions.add(question_id)
+            q['_correct_set'] = _correct_set(q.get('correct_answer'))
             unique_questions.append(q)
     
-    return unique_questions
+    return unique_questions, errors
+
+APP_STATE_FILE = Path("app_state.json")
+
+def save_app_state(state_data):
+    """Write the app state atomically so a crash never leaves a half-written file"""
+    tmp_path = APP_STATE_FILE.with_suffix(".json.tmp")
+    state_data = {name: [_public_fields(q) for q in questions] for name, questions in state_data.items()}
+    tmp_path.write_bytes(orjson.dumps(state_data, option=orjson.OPT_INDENT_2))
+    tmp_path.replace(APP_STATE_FILE)
+
+@st.cache_data(show_spinner=False)
+def load_app_state(mtime: float):
+    """Load the saved app state; mtime only invalidates the cache"""
+    return orjson.loads(APP_STATE_FILE.read_bytes())
+
+def get_app_state():
+    """Return the saved app state, re-read only when the file changes"""
+    return load_app_state(APP_STATE_FILE.stat().st_mtime)
+
+def get_real_questions():
+    """Return the cached real questions, showing any load errors"""
+    questions, errors = load_real_questions(get_real_files_mtimes())
+    for error in errors:
+        st.error(error)
+    return questions
+
+@st.cache_resource
+def get_generator():
+    """Shared basic question generator, built once per server process"""
+    return DZIQuestionGenerator()
+
+@st.cache_resource
+def get_rag_generator():
+    """Shared RAG generator, built once per server process"""
+    if SimpleRAGGenerator is None:
+        raise ImportError("src.simple_rag_generator could not be imported")
+    return SimpleRAGGenerator()
+
+def get_session_rag_generator():
+    """This session's RAG generator: the shared one with a private question list
+    
+    Questions generated here are added to the RAG context of this session only;
+    the shared instance and other sessions never see them.
+    """
+    if 'rag_generator' not in st.session_state:
+        rag_generator = copy.copy(get_rag_generator())
+        rag_generator.real_questions = list(rag_generator.real_questions)
+        st.session_state.rag_generator = rag_generator
+    return st.session_state.rag_generator
+
+def generate_for_both_subjects(generator, num_language, num_literature):
+    """Generate language and literature questions in parallel
+    
+    Returns (language_questions, literature_questions). The two calls are
+    independent, so with a network-bound generator the wall-clock time is
+    the slower call instead of the sum of both.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        language_future = executor.submit(generator.generate_questions, count=num_language, subject=SubjectArea.LANGUAGE)
+        literature_future = executor.submit(generator.generate_questions, count=num_literature, subject=SubjectArea.LITERATURE)
+        return language_future.result(), literature_future.result()
+
+def run_generation_job(job, generator, rag_generator, num_language, num_literature):
+    """Generate new questions in a worker thread
+    
+    The thread has no Streamlit script context, so it only writes to the job
+    dict; messages are collected as (level, text) pairs for the UI to show.
+    """
+    try:
+        if rag_generator is not None:
+            try:
+                # Generate new questions using RAG
+                new_language_questions, new_literature_questions = generate_for_both_subjects(
+                    rag_generator, num_language, num_literature
+                )
+                job['used_rag'] = True
+                job['messages'].append(("success", "🧠 Използвам RAG генериране (Phase 2) с OpenAI API!"))
+            except Exception as e:
+                job['messages'].append(("warning", f"⚠️ RAG генераторът не е наличен: {e}"))
+                job['messages'].append(("info", "🔄 Използвам базов генератор"))
+        
+        if not job['used_rag']:
+            # Use basic generator
+            new_language_questions, new_literature_questions = generate_for_both_subjects(
+                generator, num_language, num_literature
+            )
+        
+        # Convert to dict format
+        if job['used_rag']:
+            # RAG generator returns dictionaries directly
+            new_questions = (
+                [{**q, 'subject': 'Български език'} for q in new_language_questions] +
+                [{**q, 'subject': 'Литература'} for q in new_literature_questions]
+            )
+        else:
+            # Basic generator returns objects with attributes
+            new_questions = (
+                [_to_dict(q, 'Български език') for q in new_language_questions] +
+                [_to_dict(q, 'Литература') for q in new_literature_questions]
+            )
+        
+        job['questions'] = new_questions
+    except Exception as e:
+        job['error'] = e
+    finally:
+        job['done'] = True
+
+@st.fragment(run_every=1.0)
+def generation_progress():
+    """Poll the background generation job and merge its questions once it is done"""
+    job = st.session_state.generation_job
+    if not job['done']:
+        st.info("⏳ Генериране на нови въпроси...")
+        return
+    
+    st.session_state.generation_job = None
+    messages = list(job['messages'])
+    
+    if job['error'] is not None:
+        messages.append(("error", f"❌ Грешка при генериране: {job['error']}"))
+    else:
+        # Duplicates (same question text AND options) are skipped on insert
+        unique_new_questions, skipped_count = add_generated_questions(job['questions'])
+        
+        # Add generated questions to RAG database for future context
+        if job['used_rag']:
+            try:
+                # Plain copies without the app's internal _-prefixed dedup fields
+                job['rag_generator'].add_questions_to_database(
+                    [{k: v for k, v in q.items() if not k.startswith('_')} for q in unique_new_questions]
+                )
+                messages.append(("info", "🧠 Новогенерираните въпроси са добавени във векторната база!"))
+            except Exception as e:
+                messages.append(("warning", f"⚠️ Не можах да добавя въпросите във векторната база: {e}"))
+        
+        messages.append(("success", f"✅ Генерирани {len(unique_new_questions)} нови уникални въпроси!"))
+        if skipped_count > 0:
+            messages.append(("info", f"ℹ️ Игнорирани {skipped_count} дублиращи се въпроси (еднакви текст и опции)"))
+    
+    # Rerun the whole app so the question lists pick up the new questions
+    st.session_state.generation_messages = messages
+    st.rerun()
 
 def load_generated_questions():
     """Load generated questions from the question generator"""
     try:
-        # Import the question generator
-        import sys
-        sys.path.append('src')
-        from src.question_generator import DZIQuestionGenerator, SubjectArea
-        
-        # Create generator and generate some questions
-        generator = DZIQuestionGenerator()
+        # Generate some questions with the shared generator
+        generator = get_generator()
         
         # Generate some questions for each subject
-        generated_questions = []
-        
-        # Generate Bulgarian Language questions
         language_questions = generator.generate_questions(count=10, subject=SubjectArea.LANGUAGE)
-        for q in language_questions:
-            generated_questions.append({
-                'question': q.question_text,
-                'options': q.options,
-                'correct_answer': q.correct_answer,
-                'subject': 'Български език',
-                'difficulty': q.difficulty,
-                'points': q.points,
-                'type': 'multiple_choice'
-            })
-        
-        # Generate Literature questions
         literature_questions = generator.generate_questions(count=10, subject=SubjectArea.LITERATURE)
-        for q in literature_questions:
-            generated_questions.append({
-                'question': q.question_text,
-                'options': q.options,
-                'correct_answer': q.correct_answer,
-                'subject': 'Литература',
-                'difficulty': q.difficulty,
-                'points': q.points,
-                'type': 'multiple_choice'
-            })
+        
+        generated_questions = (
+            [_to_dict(q, 'Български език') for q in language_questions] +
+            [_to_dict(q, 'Литература') for q in literature_questions]
+        )
         
         return generated_questions
         
@@ -165,55 +279,109 @@ def load_generated_questions():
         st.error(f"❌ Error generating questions: {e}")
         return []
 
-def display_question(question, index, question_type="real", show_checkboxes=True):
-    """Display a single question with proper formatting"""
-    with st.container():
-        st.markdown(f"""
-        <div class="question-box">
-            <div class="question-number">Въпрос {index + 1}</div>
-            <div class="question-text"><strong>{question.get('question', 'N/A')}</strong></div>
-        </div>
-        """, unsafe_allow_html=True)
+def get_generated_questions():
+    """Session-memoized load_generated_questions
+    
+    Repeated calls in a session reuse the same batch; bumping
+    st.session_state.gen_nonce forces a fresh one on the next call.
+    """
+    nonce = st.session_state.setdefault('gen_nonce', 0)
+    memo = st.session_state.get('generated_memo')
+    if memo is None or memo[0] != nonce:
+        questions = load_generated_questions()
+        if not questions:
+            return []
+        memo = (nonce, questions)
+        st.session_state.generated_memo = memo
+    # Copy so later extends of the session list don't touch the memo
+    return list(memo[1])
+
+def add_generated_questions(questions):
+    """Add questions not seen before; returns (added_questions, skipped_count)
+    
+    Generated questions live in a dict keyed by _qkey, so insert-if-absent is
+    O(1) and insertion order is kept. st.session_state.generated_questions is
+    the list view of that dict and is refreshed here.
+    """
+    store = st.session_state.generated_questions_dict
+    added = []
+    for q in questions:
+        key = _qkey(q)
+        if key not in store:
+            store[key] = q
+            added.append(q)
+    st.session_state.generated_questions = list(store.values())
+    mark_questions_changed()
+    return added, len(questions) - len(added)
+
+def set_generated_questions(questions):
+    """Replace all generated questions, keeping the first of any duplicates"""
+    st.session_state.generated_questions_dict = {}
+    add_generated_questions(questions)
+
+def mark_questions_changed():
+    """Bump the question-list version; call after every change to real/generated questions"""
+    st.session_state.all_qs_version = st.session_state.get('all_qs_version', 0) + 1
+
+def get_all_questions():
+    """Combined (question, type) list, rebuilt only when the source lists change"""
+    version = st.session_state.get('all_qs_version', 0)
+    if st.session_state.get('all_qs_cache_v') != version:
+        st.session_state.all_qs_cache = (
+            list(zip(st.session_state.real_questions, repeat("real"))) +
+            list(zip(st.session_state.generated_questions, repeat("generated")))
+        )
+        st.session_state.all_qs_cache_v = version
+    return st.session_state.all_qs_cache
+
+QUESTIONS_PER_PAGE = 20
+
+def paginate(questions, key):
+    """Show a page selector and return (page_questions, offset) for the chosen page"""
+    total_pages = max(1, math.ceil(len(questions) / QUESTIONS_PER_PAGE))
+    page = st.number_input("Страница:", min_value=1, max_value=total_pages, value=1, key=key)
+    st.caption(f"Страница {page} от {total_pages}")
+    offset = (page - 1) * QUESTIONS_PER_PAGE
+    return questions[offset:offset + QUESTIONS_PER_PAGE], offset
+
+@st.fragment
+def display_question(question, index, question_type="real", show_checkboxes=True, key_scope=""):
+    """Display a single question with proper formatting
+    
+    key_scope separates widget keys when the same question is shown in more than one tab.
+    """
+    with st.container(border=True):
+        st.markdown(f"### Въпрос {index + 1}")
+        st.markdown(f"**{question.get('question', 'N/A')}**")
         
         # Show question type tag
-        if question_type == "real":
-            st.markdown('<div class="real-matura-tag">📚 Реална матура</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="generated-tag">🤖 Генериран</div>', unsafe_allow_html=True)
+        st.caption("📚 Реална матура" if question_type == "real" else "🤖 Генериран")
         
-        # Display options with checkboxes if available
+        # Display options as a single-choice radio group if available
         if question.get('options') and show_checkboxes:
-            st.markdown("**Изберете отговор:**")
-            selected_options = []
+            # Stable key lets Streamlit keep widget state between reruns
+            question_hash = hashlib.md5(question.get('question', '').encode('utf-8')).hexdigest()[:8]
+            answer_key = f"answer_{key_scope}{question_type}_{index}_{question_hash}"
             
-            for j, option in enumerate(question['options']):
-                # Create a simple but unique key
-                unique_key = f"option_{question_type}_{index}_{j}_{int(time.time() * 1000000) % 1000000}"
-                
-                if st.checkbox(f"{option}", key=unique_key):
-                    selected_options.append(option)
+            selected = st.radio("**Изберете отговор:**", question['options'], index=None, key=answer_key)
             
             # Automatic answer checking when option is selected
-            if selected_options:
+            if selected is not None:
                 # Check if selected answer is correct
-                if question.get('correct_answer') in selected_options:
+                if selected in _correct_answers(question):
                     st.success("✅ Правилен отговор!")
                 else:
                     st.error("❌ Грешен отговор!")
                     if question.get('correct_answer'):
                         st.markdown(f"**Правилният отговор е:** {question['correct_answer']}")
-        elif question.get('options'):
-            st.markdown("**Опции:**")
-            for j, option in enumerate(question['options']):
-                st.markdown(f"**{chr(65+j)}.** {option}")
-        
-        # Display correct answer if not using checkboxes
-        if question.get('correct_answer') and not show_checkboxes:
-            st.markdown(f"""
-            <div class="correct-answer">
-                <strong>Правилен отговор:</strong> {question['correct_answer']}
-            </div>
-            """, unsafe_allow_html=True)
+        elif not show_checkboxes:
+            if question.get('options'):
+                st.markdown("**Опции:**")
+                st.markdown("\n".join(
+                    f"- **{chr(65+j)}.** {option}" for j, option in enumerate(question['options'])
+                ))
+            if question.get('correct_answer'):
+                st.success(f"**Правилен отговор:** {question['correct_answer']}")
         
         # Display metadata
         if question.get('subject'):
@@ -224,77 +392,106 @@ def display_question(question, index, question_type="real", show_checkboxes=True
         
         if question.get('points'):
             st.markdown(f"**Точки:** {question['points']}")
+
+@st.fragment
+def render_all_questions():
+    """Render the combined list of real and generated questions"""
+    st.header("📚 Всички въпроси")
+    
+    all_questions = get_all_questions()
+    
+    if all_questions:
+        st.markdown(f"**Общо въпроси:** {len(all_questions)}")
         
-        st.markdown("---")
+        # Display the current page of questions
+        page_items, offset = paginate(all_questions, "page_all")
+        for i, (question, q_type) in enumerate(page_items, start=offset):
+            display_question(question, i, q_type, show_checkboxes=True, key_scope="all_")
+    else:
+        st.warning("Няма заредени въпроси")
+
+@st.fragment
+def render_real_questions():
+    """Render the real matura questions"""
+    st.header("🎯 Реални въпроси")
+    
+    if st.session_state.real_questions:
+        st.markdown(f"**Брой реални въпроси:** {len(st.session_state.real_questions)}")
+        
+        page_questions, offset = paginate(st.session_state.real_questions, "page_real")
+        for i, question in enumerate(page_questions, start=offset):
+            display_question(question, i, "real", show_checkboxes=True)
+    else:
+        st.warning("Няма заредени реални въпроси")
+
+@st.fragment
+def render_generated_questions():
+    """Render the generated questions"""
+    st.header("🤖 Генерирани въпроси")
+    
+    if st.session_state.generated_questions:
+        st.markdown(f"**Брой генерирани въпроси:** {len(st.session_state.generated_questions)}")
+        
+        page_questions, offset = paginate(st.session_state.generated_questions, "page_generated")
+        for i, question in enumerate(page_questions, start=offset):
+            display_question(question, i, "generated", show_checkboxes=True)
+    else:
+        st.warning("Няма заредени генерирани въпроси")
 
 def main():
-    st.markdown('<h1 class="main-header">📚 Всички въпроси - Реални и генерирани</h1>', unsafe_allow_html=True)
+    # Header styles are inline so no separate <style> element is sent on each rerun
+    st.markdown(
+        '<h1 style="text-align: center; color: #1f77b4; margin-bottom: 2rem;">'
+        '📚 Всички въпроси - Реални и генерирани</h1>',
+        unsafe_allow_html=True
+    )
     
     # Initialize session state
     if 'real_questions' not in st.session_state:
         st.session_state.real_questions = []
-    if 'generated_questions' not in st.session_state:
+    if 'generated_questions_dict' not in st.session_state:
+        st.session_state.generated_questions_dict = {}
         st.session_state.generated_questions = []
     
-    # Auto-load data on first run
-    if not st.session_state.real_questions:
-        # Try to load saved state first
-        try:
-            import json
-            with open('app_state.json', 'r', encoding='utf-8') as f:
-                state_data = json.load(f)
-            st.session_state.real_questions = state_data.get('real_questions', [])
-            st.session_state.generated_questions = state_data.get('generated_questions', [])
-            st.success(f"✅ Заредено запазено състояние: {len(st.session_state.real_questions)} реални, {len(st.session_state.generated_questions)} генерирани въпроси")
-        except:
-            # If no saved state, load real questions
-            with st.spinner("Зареждане на реални въпроси..."):
-                st.session_state.real_questions = load_real_questions()
-                st.success(f"✅ Заредени {len(st.session_state.real_questions)} реални въпроси")
-    
-    if not st.session_state.generated_questions:
-        with st.spinner("Генериране на начални въпроси..."):
+    # Auto-load data once per session; clearing the lists later must not re-trigger it
+    if not st.session_state.get('autoloaded'):
+        if not st.session_state.real_questions:
+            # Try to load saved state first
             try:
-                import sys
-                sys.path.append('src')
-                from src.question_generator import DZIQuestionGenerator, SubjectArea
-                
-                generator = DZIQuestionGenerator()
-                
-                # Generate some initial questions
-                language_questions = generator.generate_questions(count=10, subject=SubjectArea.LANGUAGE)
-                literature_questions = generator.generate_questions(count=10, subject=SubjectArea.LITERATURE)
-                
-                # Convert to dict format
-                initial_questions = []
-                for q in language_questions:
-                    initial_questions.append({
-                        'question': q.question_text,
-                        'options': q.options,
-                        'correct_answer': q.correct_answer,
-                        'subject': 'Български език',
-                        'difficulty': q.difficulty,
-                        'points': q.points,
-                        'type': 'multiple_choice'
-                    })
-                
-                for q in literature_questions:
-                    initial_questions.append({
-                        'question': q.question_text,
-                        'options': q.options,
-                        'correct_answer': q.correct_answer,
-                        'subject': 'Литература',
-                        'difficulty': q.difficulty,
-                        'points': q.points,
-                        'type': 'multiple_choice'
-                    })
-                
-                st.session_state.generated_questions = initial_questions
-                st.success(f"✅ Генерирани {len(initial_questions)} начални въпроси")
-                
-            except Exception as e:
-                st.warning(f"⚠️ Не можах да генерирам начални въпроси: {e}")
-                st.session_state.generated_questions = []
+                state_data = get_app_state()
+                st.session_state.real_questions = state_data.get('real_questions', [])
+                set_generated_questions(state_data.get('generated_questions', []))
+                st.success(f"✅ Заредено запазено състояние: {len(st.session_state.real_questions)} реални, {len(st.session_state.generated_questions)} генерирани въпроси")
+            except:
+                # If no saved state, load real questions
+                with st.spinner("Зареждане на реални въпроси..."):
+                    st.session_state.real_questions = get_real_questions()
+                    mark_questions_changed()
+                    st.success(f"✅ Заредени {len(st.session_state.real_questions)} реални въпроси")
+        
+        if not st.session_state.generated_questions:
+            with st.spinner("Генериране на начални въпроси..."):
+                try:
+                    generator = get_generator()
+                    
+                    # Generate some initial questions
+                    language_questions = generator.generate_questions(count=10, subject=SubjectArea.LANGUAGE)
+                    literature_questions = generator.generate_questions(count=10, subject=SubjectArea.LITERATURE)
+                    
+                    # Convert to dict format
+                    initial_questions = (
+                        [_to_dict(q, 'Български език') for q in language_questions] +
+                        [_to_dict(q, 'Литература') for q in literature_questions]
+                    )
+                    
+                    set_generated_questions(initial_questions)
+                    st.success(f"✅ Генерирани {len(st.session_state.generated_questions)} начални въпроси")
+                    
+                except Exception as e:
+                    st.warning(f"⚠️ Не можах да генерирам начални въпроси: {e}")
+                    set_generated_questions([])
+        
+        st.session_state.autoloaded = True
     
     # Sidebar controls
     with st.sidebar:
@@ -312,138 +509,57 @@ def main():
             key="generation_method"
         )
         
-        if st.button("🚀 Генерирай нови въпроси", key="generate_new"):
-            with st.spinner("Генериране на нови въпроси..."):
-                try:
-                    import sys
-                    sys.path.append('src')
-                    from src.question_generator import DZIQuestionGenerator, SubjectArea
-                    
-                    generator = DZIQuestionGenerator()
-                    
-                    if generation_method == "RAG генериране (Phase 2)":
-                        # Try to use simple RAG generator
-                        try:
-                            from src.simple_rag_generator import SimpleRAGGenerator
-                            rag_generator = SimpleRAGGenerator()
-                            
-                            # Generate new questions using RAG
-                            new_language_questions = rag_generator.generate_questions(count=num_language, subject=SubjectArea.LANGUAGE)
-                            new_literature_questions = rag_generator.generate_questions(count=num_literature, subject=SubjectArea.LITERATURE)
-                            
-                            st.success("🧠 Използвам RAG генериране (Phase 2) с OpenAI API!")
-                            
-                        except Exception as e:
-                            st.warning(f"⚠️ RAG генераторът не е наличен: {e}")
-                            st.info("🔄 Използвам базов генератор")
-                            
-                            # Fallback to basic generator
-                            new_language_questions = generator.generate_questions(count=num_language, subject=SubjectArea.LANGUAGE)
-                            new_literature_questions = generator.generate_questions(count=num_literature, subject=SubjectArea.LITERATURE)
-                    else:
-                        # Use basic generator
-                        new_language_questions = generator.generate_questions(count=num_language, subject=SubjectArea.LANGUAGE)
-                        new_literature_questions = generator.generate_questions(count=num_literature, subject=SubjectArea.LITERATURE)
-                    
-                    # Convert to dict format
-                    new_questions = []
-                    
-                    # Handle RAG generator output (already dictionaries)
-                    if generation_method == "RAG генериране (Phase 2)":
-                        # RAG generator returns dictionaries directly
-                        for q in new_language_questions:
-                            q['subject'] = 'Български език'
-                            new_questions.append(q)
-                        
-                        for q in new_literature_questions:
-                            q['subject'] = 'Литература'
-                            new_questions.append(q)
-                    else:
-                        # Basic generator returns objects with attributes
-                        for q in new_language_questions:
-                            new_questions.append({
-                                'question': q.question_text,
-                                'options': q.options,
-                                'correct_answer': q.correct_answer,
-                                'subject': 'Български език',
-                                'difficulty': q.difficulty,
-                                'points': q.points,
-                                'type': 'multiple_choice'
-                            })
-                        
-                        for q in new_literature_questions:
-                            new_questions.append({
-                                'question': q.question_text,
-                                'options': q.options,
-                                'correct_answer': q.correct_answer,
-                                'subject': 'Литература',
-                                'difficulty': q.difficulty,
-                                'points': q.points,
-                                'type': 'multiple_choice'
-                            })
-                    
-                    # Add to existing generated questions (avoid duplicates)
-                    if 'generated_questions' not in st.session_state:
-                        st.session_state.generated_questions = []
-                    
-                    # Check for duplicates before adding (by question text AND options)
-                    def is_duplicate_question(new_q, existing_questions):
-                        """Check if question is duplicate by comparing question text and options"""
-                        for existing_q in existing_questions:
-                            # Compare question text
-                            if new_q.get('question', '').strip().lower() == existing_q.get('question', '').strip().lower():
-                                # Compare options if they exist
-                                new_options = new_q.get('options', [])
-                                existing_options = existing_q.get('options', [])
-                                if len(new_options) == len(existing_options):
-                                    # Check if all options match (order doesn't matter)
-                                    new_options_sorted = sorted([opt.strip().lower() for opt in new_options])
-                                    existing_options_sorted = sorted([opt.strip().lower() for opt in existing_options])
-                                    if new_options_sorted == existing_options_sorted:
-                                        return True
-                        return False
-                    
-                    unique_new_questions = []
-                    skipped_count = 0
-                    
-                    for new_q in new_questions:
-                        if not is_duplicate_question(new_q, st.session_state.generated_questions):
-                            unique_new_questions.append(new_q)
-                        else:
-                            skipped_count += 1
-                    
-                    st.session_state.generated_questions.extend(unique_new_questions)
-                    
-                    # Add generated questions to RAG database for future context
-                    if generation_method == "RAG генериране (Phase 2)":
-                        try:
-                            # Add questions to RAG database
-                            rag_generator.add_questions_to_database(unique_new_questions)
-                            st.info("🧠 Новогенерираните въпроси са добавени във векторната база!")
-                        except Exception as e:
-                            st.warning(f"⚠️ Не можах да добавя въпросите във векторната база: {e}")
-                    
-                    st.success(f"✅ Генерирани {len(unique_new_questions)} нови уникални въпроси!")
-                    if skipped_count > 0:
-                        st.info(f"ℹ️ Игнорирани {skipped_count} дублиращи се въпроси (еднакви текст и опции)")
-                    st.rerun()
-                    
-                except Exception as e:
-                    st.error(f"❌ Грешка при генериране: {e}")
+        if st.button("🚀 Генерирай нови въпроси", key="generate_new",
+                     disabled=st.session_state.get('generation_job') is not None):
+            try:
+                generator = get_generator()
+                job = {'done': False, 'questions': None, 'used_rag': False, 'error': None, 'messages': []}
+                
+                rag_generator = None
+                if generation_method == "RAG генериране (Phase 2)":
+                    # Try to use simple RAG generator
+                    try:
+                        rag_generator = get_session_rag_generator()
+                    except Exception as e:
+                        job['messages'].append(("warning", f"⚠️ RAG генераторът не е наличен: {e}"))
+                        job['messages'].append(("info", "🔄 Използвам базов генератор"))
+                job['rag_generator'] = rag_generator
+                
+                # Generate in the background so the questions stay browsable meanwhile
+                thread = threading.Thread(
+                    target=run_generation_job,
+                    args=(job, generator, rag_generator, num_language, num_literature),
+                    daemon=True
+                )
+                thread.start()
+                st.session_state.generation_job = job
+                
+            except Exception as e:
+                st.error(f"❌ Грешка при генериране: {e}")
+        
+        if st.session_state.get('generation_job') is not None:
+            generation_progress()
+        
+        # Messages from the last finished generation
+        for level, text in st.session_state.pop('generation_messages', []):
+            getattr(st, level)(text)
         
         st.markdown("---")
         
         # Load real questions
         if st.button("📚 Зареди реални въпроси", key="load_real"):
             with st.spinner("Зареждане на реални въпроси..."):
-                st.session_state.real_questions = load_real_questions()
+                st.session_state.real_questions = get_real_questions()
+                mark_questions_changed()
                 st.success(f"✅ Заредени {len(st.session_state.real_questions)} реални въпроси")
                 st.rerun()
         
         # Clear all questions
         if st.button("🗑️ Изчисти всички въпроси", key="clear_all"):
             st.session_state.real_questions = []
-            st.session_state.generated_questions = []
+            set_generated_questions([])
+            # Next "load all" generates a fresh batch instead of the memoized one
+            st.session_state.gen_nonce = st.session_state.get('gen_nonce', 0) + 1
             st.success("✅ Всички въпроси изчистени")
             st.rerun()
         
@@ -453,24 +569,20 @@ def main():
         
         if st.button("💾 Запази състоянието", key="save_state"):
             try:
-                import json
                 state_data = {
                     'real_questions': st.session_state.real_questions,
                     'generated_questions': st.session_state.generated_questions
                 }
-                with open('app_state.json', 'w', encoding='utf-8') as f:
-                    json.dump(state_data, f, ensure_ascii=False, indent=2)
+                save_app_state(state_data)
                 st.success("✅ Състоянието е запазено в app_state.json")
             except Exception as e:
                 st.error(f"❌ Грешка при запазване: {e}")
         
         if st.button("📂 Зареди запазено състояние", key="load_state"):
             try:
-                import json
-                with open('app_state.json', 'r', encoding='utf-8') as f:
-                    state_data = json.load(f)
+                state_data = get_app_state()
                 st.session_state.real_questions = state_data.get('real_questions', [])
-                st.session_state.generated_questions = state_data.get('generated_questions', [])
+                set_generated_questions(state_data.get('generated_questions', []))
                 st.success("✅ Състоянието е заредено от app_state.json")
                 st.rerun()
             except Exception as e:
@@ -479,8 +591,8 @@ def main():
     # Load questions
     if st.button("🔄 Зареди всички въпроси", key="load_all"):
         with st.spinner("Зареждане на въпроси..."):
-            st.session_state.real_questions = load_real_questions()
-            st.session_state.generated_questions = load_generated_questions()
+            st.session_state.real_questions = get_real_questions()
+            set_generated_questions(get_generated_questions())
             
             total_real = len(st.session_state.real_questions)
             total_generated = len(st.session_state.generated_questions)
@@ -491,55 +603,20 @@ def main():
         st.info("👆 Натисни 'Зареди всички въпроси' за да започнеш")
         return
     
-    # Create tabs
-    tab1, tab2, tab3 = st.tabs(["📚 Всички въпроси", "🎯 Реални въпроси", "🤖 Генерирани въпроси"])
+    # Only the selected view is rendered, so inactive views cost nothing on rerun
+    view = st.radio(
+        "Изглед:",
+        ["📚 Всички въпроси", "🎯 Реални въпроси", "🤖 Генерирани въпроси"],
+        horizontal=True,
+        key="view"
+    )
     
-    with tab1:
-        st.header("📚 Всички въпроси")
-        
-        all_questions = []
-        question_types = []
-        
-        # Add real questions
-        for i, question in enumerate(st.session_state.real_questions):
-            all_questions.append(question)
-            question_types.append("real")
-        
-        # Add generated questions
-        for i, question in enumerate(st.session_state.generated_questions):
-            all_questions.append(question)
-            question_types.append("generated")
-        
-        if all_questions:
-            st.markdown(f"**Общо въпроси:** {len(all_questions)}")
-            
-            # Display all questions
-            for i, (question, q_type) in enumerate(zip(all_questions, question_types)):
-                display_question(question, i, q_type, show_checkboxes=True)
-        else:
-            st.warning("Няма заредени въпроси")
-    
-    with tab2:
-        st.header("🎯 Реални въпроси")
-        
-        if st.session_state.real_questions:
-            st.markdown(f"**Брой реални въпроси:** {len(st.session_state.real_questions)}")
-            
-            for i, question in enumerate(st.session_state.real_questions):
-                display_question(question, i, "real", show_checkboxes=True)
-        else:
-            st.warning("Няма заредени реални въпроси")
-    
-    with tab3:
-        st.header("🤖 Генерирани въпроси")
-        
-        if st.session_state.generated_questions:
-            st.markdown(f"**Брой генерирани въпроси:** {len(st.session_state.generated_questions)}")
-            
-            for i, question in enumerate(st.session_state.generated_questions):
-                display_question(question, i, "generated", show_checkboxes=True)
-        else:
-            st.warning("Няма заредени генерирани въпроси")
+    if view == "📚 Всички въпроси":
+        render_all_questions()
+    elif view == "🎯 Реални въпроси":
+        render_real_questions()
+    else:
+        render_generated_questions()
     
     # Footer
     st.markdown("---")
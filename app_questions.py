@@ -2,8 +2,20 @@
 Streamlit app for DZI question generation with auto-check
 """
 import streamlit as st
+import math
+import numpy as np
 import random
-from src.question_generator import DZIQuestionGenerator, SubjectArea, QuestionType
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+
+from src.question_generator import DZIQuestionGenerator, Question, SubjectArea
 
 # Page config
 st.set_page_config(
@@ -13,7 +25,10 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+@st.cache_resource
+def _page_css():
+    """Static stylesheet, built once per server process"""
+    return """
 <style>
 .question-box {
     background-color: #e3f2fd;
@@ -45,57 +60,186 @@ st.markdown("""
     margin: 10px 0;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Re-emitted every run: elements missing from a rerun are removed from the page
+st.markdown(_page_css(), unsafe_allow_html=True)
+
+@st.cache_resource
+def get_generator():
+    """Shared question generator, built once per server process"""
+    return DZIQuestionGenerator()
+
+SESSION_CACHE_DIR = Path(".cache")
+# Saved sessions untouched for this long are deleted on the next save
+SESSION_MAX_AGE_SECONDS = 24 * 60 * 60
+
+def get_session_id():
+    """Session id kept in the URL (?sid=...), so a reopened tab finds its questions"""
+    sid = st.query_params.get("sid", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", sid):
+        sid = uuid.uuid4().hex
+        st.query_params["sid"] = sid
+    return sid
+
+def prune_session_files():
+    """Delete saved sessions older than SESSION_MAX_AGE_SECONDS"""
+    cutoff = time.time() - SESSION_MAX_AGE_SECONDS
+    for path in SESSION_CACHE_DIR.glob("session_*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+def save_session_questions(questions):
+    """Persist the generated questions for this session (atomic write)
+    
+    Stored as JSON, not pickle: the file name comes from the URL, so loading
+    it must not be able to run code.
+    """
+    SESSION_CACHE_DIR.mkdir(exist_ok=True)
+    path = SESSION_CACHE_DIR / f"session_{get_session_id()}.json"
+    tmp_path = path.with_suffix(".json.tmp")
+    # orjson writes dataclasses as dicts and enums as their values
+    tmp_path.write_bytes(orjson.dumps(questions))
+    tmp_path.replace(path)
+    prune_session_files()
+
+def load_session_questions():
+    """Questions saved by an earlier visit with the same session id, if any"""
+    path = SESSION_CACHE_DIR / f"session_{get_session_id()}.json"
+    try:
+        return [Question.from_dict(data) for data in orjson.loads(path.read_bytes())]
+    except Exception:
+        return []
 
 def initialize_session_state():
     """Initialize session state variables"""
     if 'generator' not in st.session_state:
-        st.session_state.generator = DZIQuestionGenerator()
+        st.session_state.generator = get_generator()
     if 'generated_questions' not in st.session_state:
-        st.session_state.generated_questions = []
+        st.session_state.generated_questions = load_session_questions()
     if 'current_question_index' not in st.session_state:
         st.session_state.current_question_index = 0
+    if 'stats' not in st.session_state:
+        st.session_state.stats = compute_stats(st.session_state.generated_questions)
+
+QUESTIONS_PER_PAGE = 10
+
+def compute_stats(questions):
+    """Subject counts and question types, gathered once per question list"""
+    subject_counts = Counter(q.subject_area for q in questions)
+    # Type values as a numpy array, so filtering by type is a vectorized compare;
+    # question_arr holds the questions in the same order and is permuted with it
+    type_arr = np.array([q.question_type.value for q in questions], dtype=str)
+    question_arr = np.empty(len(questions), dtype=object)
+    question_arr[:] = questions
+    return {
+        'lang': subject_counts[SubjectArea.LANGUAGE],
+        'lit': subject_counts[SubjectArea.LITERATURE],
+        'types': np.unique(type_arr).tolist(),
+        'type_arr': type_arr,
+        'question_arr': question_arr
+    }
+
+@lru_cache(maxsize=4096)
+def widget_key(question_id, question_index=None):
+    """Interned widget key for a question, formatted once per (id, index)"""
+    # Streamlit keys must be strings, so the tuple is only the memo key
+    key_suffix = f"_{question_index}" if question_index is not None else ""
+    return sys.intern(f"q_{question_id}{key_suffix}")
 
 def display_question(question, show_answer=False, question_index=None):
     """Показва въпрос в красив формат"""
-    st.markdown(f'''
-    <div class="question-box">
-        <h3>{question.question_text}</h3>
-    </div>
-    ''', unsafe_allow_html=True)
-    
-    if question.options:
-        st.markdown('<div class="options-box">', unsafe_allow_html=True)
-        st.markdown("**Изберете отговор:**")
-        
-        # Създаваме чекбоксове за всеки отговор с уникален ключ
-        selected_options = []
-        for i, option in enumerate(question.options):
-            # Използваме question_index за уникални ключове
-            key_suffix = f"_{question_index}" if question_index is not None else ""
-            if st.checkbox(f"{option}", key=f"option_{question.id}_{i}{key_suffix}"):
-                selected_options.append(option)
+    with st.container():
+        # Текстът на въпроса, верният отговор и обяснението са един markdown блок
+        html = f'''
+        <div class="question-box">
+            <h3>{question.question_text}</h3>
+        </div>
+        '''
+        if show_answer and question.correct_answer:
+            html += f'''
+        <div class="answer-box">
+            <strong>Правилен отговор:</strong><br>{question.correct_answer}
+        </div>
+        '''
+        if show_answer and question.explanation:
+            html += f"\n\n**Обяснение:**\n\n{question.explanation}"
+        st.markdown(html, unsafe_allow_html=True)
         
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Автоматична проверка при избор на отговор
-        if selected_options:
-            # Проверяваме дали избраният отговор е правилен
-            if question.correct_answer in selected_options:
-                st.success("✅ Правилен отговор!")
-            else:
-                st.error("❌ Грешен отговор!")
-                st.markdown(f"**Правилният отговор е:** {question.correct_answer}")
-    
-    if show_answer and question.correct_answer:
-        st.markdown('<div class="answer-box">', unsafe_allow_html=True)
-        st.markdown("**Правилен отговор:**")
-        st.markdown(question.correct_answer)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    if show_answer and question.explanation:
-        st.markdown("**Обяснение:**")
-        st.markdown(question.explanation)
+        if question.options:
+            # Един radio бутон вместо отделен чекбокс за всеки отговор
+            choice = st.radio(
+                "**Изберете отговор:**",
+                question.options,
+                index=None,
+                key=widget_key(question.id, question_index)
+            )
+            
+            # Автоматична проверка при избор на отговор
+            if choice is not None:
+                # Проверяваме дали избраният отговор е правилен
+                if choice == question.correct_answer:
+                    st.success("✅ Правилен отговор!")
+                else:
+                    st.error("❌ Грешен отговор!")
+                    st.markdown(f"**Правилният отговор е:** {question.correct_answer}")
+
+@st.fragment
+def question_view():
+    """Current question with its navigation; navigation reruns only this fragment"""
+    questions = st.session_state.generated_questions
+    current_index = st.session_state.current_question_index
+    current_question = questions[current_index]
+    
+    # Question display
+    st.markdown(f"### Въпрос {current_index + 1} от {len(questions)}")
+    
+    # Question info
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f"**Предмет:** {current_question.subject_area.value}")
+    with col2:
+        st.markdown(f"**Тема:** {current_question.topic.value}")
+    with col3:
+        st.markdown(f"**Трудност:** {current_question.difficulty}")
+    
+    # Display question
+    display_question(current_question)
+    
+    # Navigation
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        if st.button("⬅️ Предишен"):
+            if current_index > 0:
+                st.session_state.current_question_index = current_index - 1
+                st.rerun(scope="fragment")
+    
+    with col2:
+        if st.button("➡️ Следващ"):
+            if current_index < len(questions) - 1:
+                st.session_state.current_question_index = current_index + 1
+                st.rerun(scope="fragment")
+    
+    with col3:
+        if st.button("🎲 Случаен"):
+            st.session_state.current_question_index = random.randrange(len(questions))
+            st.rerun(scope="fragment")
+    
+    if st.button("🔀 Разбъркай въпроси"):
+        # One permutation for the list and the stats arrays, so they stay aligned
+        stats = st.session_state.stats
+        perm = np.random.permutation(len(stats['question_arr']))
+        stats['type_arr'] = stats['type_arr'][perm]
+        stats['question_arr'] = stats['question_arr'][perm]
+        st.session_state.generated_questions = stats['question_arr'].tolist()
+        save_session_questions(st.session_state.generated_questions)
+        st.session_state.current_question_index = 0
+        # The show-all list lives outside the fragment and would go stale
+        st.rerun(scope="app" if st.session_state.get('show_all') else "fragment")
 
 def main():
     """Main app function"""
@@ -127,6 +271,8 @@ def main():
                 questions = st.session_state.generator.generate_questions(count, SubjectArea.LITERATURE)
             
             st.session_state.generated_questions = questions
+            st.session_state.stats = compute_stats(questions)
+            save_session_questions(questions)
             st.session_state.current_question_index = 0
             st.rerun()
         
@@ -135,83 +281,51 @@ def main():
             st.markdown("### 📊 Статистики")
             st.markdown(f"**Общо въпроси:** {len(st.session_state.generated_questions)}")
             
-            language_count = len([q for q in st.session_state.generated_questions if q.subject_area == SubjectArea.LANGUAGE])
-            literature_count = len([q for q in st.session_state.generated_questions if q.subject_area == SubjectArea.LITERATURE])
-            
-            st.markdown(f"**Български език:** {language_count}")
-            st.markdown(f"**Литература:** {literature_count}")
+            st.markdown(f"**Български език:** {st.session_state.stats['lang']}")
+            st.markdown(f"**Литература:** {st.session_state.stats['lit']}")
     
     # Main content
     if not st.session_state.generated_questions:
         st.info("👆 Изберете параметри и натиснете 'Генерирай въпроси' за да започнете")
         return
     
-    questions = st.session_state.generated_questions
-    current_index = st.session_state.current_question_index
-    current_question = questions[current_index]
-    
-    # Question display
-    st.markdown(f"### Въпрос {current_index + 1} от {len(questions)}")
-    
-    # Question info
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown(f"**Предмет:** {current_question.subject_area.value}")
-    with col2:
-        st.markdown(f"**Тема:** {current_question.topic.value}")
-    with col3:
-        st.markdown(f"**Трудност:** {current_question.difficulty}")
-    
-    # Display question
-    display_question(current_question)
-    
-    # Navigation
-    col1, col2, col3 = st.columns([1, 1, 1])
-    
-    with col1:
-        if st.button("⬅️ Предишен"):
-            if current_index > 0:
-                st.session_state.current_question_index = current_index - 1
-                st.rerun()
+    # Question display + navigation rerun on their own
+    question_view()
     
-    with col2:
-        if st.button("➡️ Следващ"):
-            if current_index < len(questions) - 1:
-                st.session_state.current_question_index = current_index + 1
-                st.rerun()
-    
-    with col3:
-        if st.button("🎲 Случаен"):
-            st.session_state.current_question_index = random.randint(0, len(questions) - 1)
-            st.rerun()
+    questions = st.session_state.generated_questions
     
     # Additional controls
     st.markdown("---")
-    col1, col2, col3 = st.columns(3)
+    col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("🔀 Разбъркай въпроси"):
-            random.shuffle(st.session_state.generated_questions)
-            st.session_state.current_question_index = 0
-            st.rerun()
-    
-    with col2:
         if st.button("📊 Покажи всички"):
-            for i, q in enumerate(questions):
-                st.markdown(f"### Въпрос {i+1}")
-                display_question(q, question_index=i)
-                st.markdown("---")
+            # Toggle, so the list survives reruns triggered by the page selector
+            st.session_state.show_all = not st.session_state.get('show_all', False)
     
-    with col3:
+    with col2:
         if st.button("🎯 Филтрирай по тип"):
-            question_types = list(set([q.type.value for q in questions]))
-            selected_type = st.selectbox("Изберете тип:", question_types)
+            selected_type = st.selectbox("Изберете тип:", st.session_state.stats['types'])
             
-            filtered_questions = [q for q in questions if q.type.value == selected_type]
+            stats = st.session_state.stats
+            filtered_questions = stats['question_arr'][stats['type_arr'] == selected_type].tolist()
             if filtered_questions:
                 st.session_state.generated_questions = filtered_questions
+                st.session_state.stats = compute_stats(filtered_questions)
+                save_session_questions(filtered_questions)
                 st.session_state.current_question_index = 0
                 st.rerun()
+    
+    # Show all questions, one page at a time
+    if st.session_state.get('show_all'):
+        total_pages = max(1, math.ceil(len(questions) / QUESTIONS_PER_PAGE))
+        page = st.number_input("Страница:", min_value=1, max_value=total_pages, value=1, key="show_all_page")
+        offset = (page - 1) * QUESTIONS_PER_PAGE
+        
+        for i, q in enumerate(questions[offset:offset + QUESTIONS_PER_PAGE], start=offset):
+            st.markdown(f"### Въпрос {i+1}")
+            display_question(q, question_index=i)
+            st.markdown("---")
 
 if __name__ == "__main__":
     main()
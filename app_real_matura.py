@@ -4,10 +4,19 @@ Reads real questions + AI questions from ai-data folder
 No AI generation, no imports - just displays questions
 """
 import streamlit as st
-import json
+import itertools
 import os
+import random
 import glob
-from src.real_matura_generator import RealMaturaGenerator, SubjectArea
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
+
+from src.real_matura_generator import RealMaturaGenerator
+from src.matura_ui import inject_stylesheet, render_answer_feedback, render_source_tag
 
 # Page config
 st.set_page_config(
@@ -16,449 +25,214 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-/* Clean design without borders */
-.question-box {
-    background-color: #ffffff;
-    padding: 16px;
-    margin: 8px 0;
-    font-size: 16px;
-    line-height: 1.5;
-    border: none;
-    box-shadow: none;
-}
-
-.options-box {
-    background-color: #ffffff;
-    padding: 16px;
-    margin: 8px 0;
-    border: none;
-    box-shadow: none;
-}
-
-.answer-box {
-    background-color: #e8f5e8;
-    padding: 12px;
-    margin: 8px 0;
-    border: none;
-    box-shadow: none;
-}
-
-.real-matura-tag {
-    background-color: #4caf50;
-    color: white;
-    padding: 4px 8px;
-    border-radius: 4px;
-    font-size: 11px;
-    display: inline-block;
-    margin-bottom: 8px;
-    font-weight: 500;
-    border: none;
-}
-
-.ai-generated-tag {
-    background: linear-gradient(90deg, #FF6B6B, #4ECDC4);
-    color: white;
-    padding: 4px 8px;
-    border-radius: 4px;
-    font-size: 11px;
-    font-weight: bold;
-    display: inline-block;
-    margin-bottom: 8px;
-}
-
-.spelling-tag {
-    background: linear-gradient(90deg, #9C27B0, #E91E63);
-    color: white;
-    padding: 4px 8px;
-    border-radius: 4px;
-    font-size: 11px;
-    font-weight: bold;
-    display: inline-block;
-    margin-bottom: 8px;
-}
-
-.context-text {
-    background-color: #fff3e0;
-    padding: 12px;
-    margin: 8px 0;
-    border-radius: 4px;
-    border: none;
-}
-
-/* Remove all borders and make design cleaner */
-.stContainer {
-    width: 100% !important;
-}
-
-/* Reduce spacing between Streamlit elements */
-.stApp > div > div > div > div {
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-.stApp > div > div > div > div > div {
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-/* Reduce spacing between specific elements */
-.stMarkdown {
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-.stButton {
-    margin: 2px 0 !important;
-}
-
-.stCheckbox {
-    margin: 1px 0 !important;
-}
-
-/* Reduce spacing in columns */
-.stColumn {
-    margin: 0 !important;
-    padding: 0 4px !important;
-}
-
-/* Reduce spacing between all Streamlit elements */
-div[data-testid="stVerticalBlock"] {
-    gap: 0 !important;
-}
-
-div[data-testid="stVerticalBlock"] > div {
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-div[data-testid="stHorizontalBlock"] {
-    gap: 0 !important;
-}
-
-div[data-testid="stHorizontalBlock"] > div {
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-/* Reduce spacing in main content area */
-.main .block-container {
-    padding: 1rem 1rem 1rem 1rem !important;
-}
-
-/* Reduce spacing between elements */
-.stApp > div > div > div > div > div > div {
-    margin: 0 !important;
-    padding: 0 !important;
-}
-
-/* Compact mode styling */
-.compact-question {
-    margin: 8px 0;
-    padding: 12px;
-    background-color: #f8f9fa;
-    border-radius: 8px;
-    border-left: 4px solid #4caf50;
-    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    transition: all 0.3s ease;
-}
-
-/* .compact-question:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-} */
-
-.compact-question.real {
-    border-left-color: #4caf50; /* Green for real questions */
-    background: linear-gradient(135deg, #f8f9fa 0%, #e8f5e8 100%);
-}
-
-.compact-question.ai {
-    border-left-color: #ff6b6b; /* Red for AI questions */
-    background: linear-gradient(135deg, #f8f9fa 0%, #ffe8e8 100%);
-}
-
-.compact-question.spelling {
-    border-left-color: #9c27b0; /* Purple for spelling questions */
-    background: linear-gradient(135deg, #f8f9fa 0%, #f3e5f5 100%);
-}
-
-.compact-options {
-    margin: 4px 0;
-    padding: 4px 0;
-}
-
-.compact-options .stCheckbox {
-    margin: 1px 0 !important;
-}
-
-.compact-options .stCheckbox > label {
-    padding: 4px 8px;
-    font-size: 13px;
-    line-height: 1.2;
-}
-
-/* Enhanced checkbox styling */
-.stCheckbox {
-    margin: 2px 0 !important;
-}
-
-.stCheckbox > label {
-    font-size: 14px;
-    line-height: 1.3;
-    padding: 6px 10px;
-    border-radius: 6px;
-    transition: all 0.2s ease;
-    cursor: pointer;
-    margin: 1px 0 !important;
-}
-
-/* .stCheckbox > label:hover {
-    background-color: #e3f2fd;
-    transform: translateX(4px);
-} */
-
-.stCheckbox > input[type="checkbox"]:checked + label {
-    background-color: #e8f5e8;
-    color: #2e7d32;
-    font-weight: 500;
-}
-
-/* Progress indicator */
-.progress-bar {
-    width: 100%;
-    height: 4px;
-    background-color: #e0e0e0;
-    border-radius: 2px;
-    overflow: hidden;
-    margin: 6px 0;
-    border: none;
-    box-shadow: inset 0 1px 2px rgba(0,0,0,0.1);
-}
-
-.progress-fill {
-    height: 100%;
-    background: linear-gradient(90deg, #4caf50, #8bc34a);
-    border-radius: 4px;
-    transition: width 0.5s ease;
-    box-shadow: 0 1px 3px rgba(76, 175, 80, 0.3);
-}
-
-/* Enhanced buttons */
-.stButton > button {
-    border-radius: 6px;
-    font-weight: 500;
-    transition: all 0.3s ease;
-    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-    padding: 6px 12px;
-    font-size: 14px;
-}
-
-/* .stButton > button:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 4px 8px rgba(0,0,0,0.15);
-} */
-
-/* Question counter styling */
-.question-counter {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    color: white;
-    padding: 4px 12px;
-    border-radius: 12px;
-    font-weight: 500;
-    text-align: center;
-    margin: 8px 0;
-    font-size: 14px;
-    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-}
-
-/* Success/Error animations - DISABLED */
-/* @keyframes successPulse {
-    0% { transform: scale(1); }
-    50% { transform: scale(1.05); }
-    100% { transform: scale(1); }
-}
-
-@keyframes errorShake {
-    0%, 100% { transform: translateX(0); }
-    25% { transform: translateX(-5px); }
-    75% { transform: translateX(5px); }
-}
+# Styles live in assets/style.css; colors come from .streamlit/config.toml
+STYLE_FILE = Path(__file__).parent / "assets" / "style.css"
+inject_stylesheet(STYLE_FILE)
 
-.success-animation {
-    animation: successPulse 0.6s ease-in-out;
-}
-
-.error-animation {
-    animation: errorShake 0.6s ease-in-out;
-} */
-
-/* Enhanced success/error messages */
-.stSuccess {
-    background: linear-gradient(135deg, #4caf50, #8bc34a);
-    color: white;
-    border-radius: 8px;
-    padding: 12px 16px;
-    font-weight: 500;
-    box-shadow: 0 4px 8px rgba(76, 175, 80, 0.3);
-}
-
-.stError {
-    background: linear-gradient(135deg, #f44336, #ff7043);
-    color: white;
-    border-radius: 8px;
-    padding: 12px 16px;
-    font-weight: 500;
-    box-shadow: 0 4px 8px rgba(244, 67, 54, 0.3);
-}
-</style>
-""", unsafe_allow_html=True)
-
-def is_duplicate_question(question, existing_questions):
-    """Check if question is duplicate based on question text and options"""
-    question_text = question.get('question', '').strip().lower()
-    question_options = sorted([opt.strip().lower() for opt in question.get('options', [])])
-    
-    for existing in existing_questions:
-        existing_text = existing.get('question', '').strip().lower()
-        existing_options = sorted([opt.strip().lower() for opt in existing.get('options', [])])
-        
-        # Check if question text and options are identical
-        if question_text == existing_text and question_options == existing_options:
-            return True
+def question_fingerprint(question):
+    """Hashable identity of a question: normalized text and sorted options
     
-    return False
-
-def load_all_questions():
-    """Load all questions: real + AI + spelling from ai-data folder"""
-    all_questions = []
-    duplicates_removed = 0
+    The normalized fields are stored on the dict as '_qnorm' and '_optnorm' at
+    load time, so filtering or search later reads them instead of re-normalizing.
+    """
+    if '_qnorm' not in question:
+        question['_qnorm'] = question.get('question', '').strip().lower()
+        question['_optnorm'] = tuple(sorted(opt.strip().lower() for opt in question.get('options', [])))
+    return question['_qnorm'], question['_optnorm']
+
+REAL_QUESTION_FILES = ['data/matura_21_05_2025.json', 'data/matura_2025_avgust.json']
+MAX_LOAD_WORKERS = 8
+MANIFEST_TTL_SECONDS = 10
+ALL_SUBJECTS = "Всички"
+QUESTIONS_PER_PAGE = 25
+AI_QUESTION_PATTERNS = ["ai-data/ai_questions_*.json", "ai-data/*spelling*questions*.json", "ai-data/comprehensive_spelling*questions*.json"]
+
+@st.cache_data(show_spinner=False)
+def load_real_matura_questions(real_manifest: tuple = ()):
+    """Real exam questions read by the shared generator, as normalized app dicts
     
-    # Load real questions
+    real_manifest only invalidates the cache, so the files are re-read and
+    converted only when one of REAL_QUESTION_FILES changes, not ai-data.
+    """
+    # A private generator: the shared cache_resource one is seen by every session
+    # and must not be reloaded here; the constructor reads the files
     generator = RealMaturaGenerator()
-    real_questions = generator.load_real_questions()
+    real_questions = []
+    for i, q in enumerate(generator.questions_data):
+        q_dict = real_question_to_dict(q, i)
+        question_fingerprint(q_dict)
+        real_questions.append(q_dict)
+    return real_questions
+
+@st.cache_data(ttl=MANIFEST_TTL_SECONDS, show_spinner=False)
+def get_question_files_manifest():
+    """(path, mtime, size) for every question file, used as a cache key
     
-    # Check if real_questions is not None
-    if real_questions:
-        # Add real questions with metadata
-        for i, q in enumerate(real_questions):
-            # Handle both dict and object formats
-            if isinstance(q, dict):
-                q_dict = {
-                    'id': f"real_{i}",
-                    'source': 'real',
-                    'question': q.get('question', 'N/A'),
-                    'options': q.get('options', []),
-                    'correct_answer': q.get('correct_answer', ''),
-                    'subject': q.get('subject', 'Unknown'),
-                    'difficulty': q.get('difficulty', 'medium'),
-                    'points': q.get('points', 1),
-                    'context_texts': q.get('context_texts', {})
-                }
-            else:
-                q_dict = {
-                    'id': f"real_{i}",
-                    'source': 'real',
-                    'question': q.question_text,
-                    'options': q.options,
-                    'correct_answer': q.correct_answer,
-                    'subject': q.subject_area.value if hasattr(q, 'subject_area') else 'Unknown',
-                    'difficulty': getattr(q, 'difficulty', 'medium'),
-                    'points': getattr(q, 'points', 1),
-                    'context_texts': getattr(q, 'context_texts', {})
-                }
-            
-            # Check for duplicates before adding
-            if not is_duplicate_question(q_dict, all_questions):
-                all_questions.append(q_dict)
-            else:
-                duplicates_removed += 1
-    
-    # Load AI questions from ai-data folder
-    ai_files = glob.glob("ai-data/ai_questions_*.json")
-    for ai_file in ai_files:
+    Cached for MANIFEST_TTL_SECONDS so ordinary reruns do no file system I/O;
+    a changed file is picked up once the entry expires.
+    """
+    paths = set(REAL_QUESTION_FILES)
+    for pattern in AI_QUESTION_PATTERNS:
+        paths.update(glob.glob(pattern))
+    manifest = []
+    for p in sorted(paths):
         try:
-            with open(ai_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                ai_questions = data.get('questions', [])
-                
-                # Add AI questions with metadata
-                for i, q in enumerate(ai_questions):
-                    q_dict = {
-                        'id': f"ai_{ai_file}_{i}",
-                        'source': 'ai_generated',
-                        'question': q.get('question', 'N/A'),
-                        'options': q.get('options', []),
-                        'correct_answer': q.get('correct_answer', ''),
-                        'subject': q.get('subject', 'Unknown'),
-                        'difficulty': q.get('difficulty', 'medium'),
-                        'points': q.get('points', 1)
-                    }
-                    
-                    # Check for duplicates before adding
-                    if not is_duplicate_question(q_dict, all_questions):
-                        all_questions.append(q_dict)
-                    else:
-                        duplicates_removed += 1
-                    
-        except Exception as e:
-            st.error(f"Error loading {ai_file}: {e}")
+            stat = os.stat(p)
+            manifest.append((p, stat.st_mtime, stat.st_size))
+        except OSError:
+            manifest.append((p, 0.0, 0))
+    return tuple(manifest)
+
+def load_questions_file(path):
+    """Read the 'questions' list of one JSON file; returns (questions, error)"""
+    try:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+        return data.get('questions', []), None
+    except Exception as e:
+        return [], e
+
+@st.cache_data(show_spinner="Зареждане на въпроси...", persist="disk")
+def load_all_questions(manifest: tuple = ()):
+    """Load all questions: real + AI + spelling from ai-data folder
     
-    # Load spelling questions from ai-data folder
+    Returns a (questions, errors) tuple so the result stays cacheable; errors
+    are rendered by the caller. manifest keys the cache, so a load with a bad
+    file is reused until that file changes, and then it is reloaded.
+    """
+    return build_all_questions(manifest)
+
+def real_question_to_dict(q, i):
+    """Normalize a real exam question (dict or Question object) to the app's dict format"""
+    # Handle both dict and object formats
+    if isinstance(q, dict):
+        return {
+            'id': f"real_{i}",
+            'source': 'real',
+            'question': q.get('question', 'N/A'),
+            'options': q.get('options', []),
+            'correct_answer': q.get('correct_answer', ''),
+            'subject': q.get('subject', 'Unknown'),
+            'difficulty': q.get('difficulty', 'medium'),
+            'points': q.get('points', 1),
+            'context_texts': q.get('context_texts', {})
+        }
+    return {
+        'id': f"real_{i}",
+        'source': 'real',
+        'question': q.question_text,
+        'options': q.options,
+        'correct_answer': q.correct_answer,
+        'subject': q.subject_area.value if hasattr(q, 'subject_area') else 'Unknown',
+        'difficulty': getattr(q, 'difficulty', 'medium'),
+        'points': getattr(q, 'points', 1),
+        'context_texts': getattr(q, 'context_texts', {})
+    }
+
+def file_question_to_dict(q, path, i, source):
+    """Normalize a question from an ai-data file to the app's dict format"""
+    if source == 'spelling':
+        return {
+            'id': f"spelling_{path}_{i}",
+            'source': 'spelling',
+            'question': q.get('question', 'N/A'),
+            'options': q.get('options', []),
+            'correct_answer': q.get('correct_answer', ''),
+            'subject': 'Правопис',  # Set subject to "Правопис"
+            'difficulty': q.get('difficulty', 'medium'),
+            'points': q.get('points', 1),
+            'category': q.get('category', 'правопис'),
+            'question_type': q.get('question_type', ''),
+            'common_error': q.get('common_error', ''),
+            'correct_word': q.get('correct_word', ''),
+            'wrong_word': q.get('wrong_word', '')
+        }
+    return {
+        'id': f"ai_{path}_{i}",
+        'source': 'ai_generated',
+        'question': q.get('question', 'N/A'),
+        'options': q.get('options', []),
+        'correct_answer': q.get('correct_answer', ''),
+        'subject': q.get('subject', 'Unknown'),
+        'difficulty': q.get('difficulty', 'medium'),
+        'points': q.get('points', 1)
+    }
+
+def iter_file_questions(paths, results, source, errors):
+    """Yield questions from loaded ai-data files, recording load errors"""
+    for path, (questions, error) in zip(paths, results):
+        if error:
+            errors.append(f"Error loading {path}: {error}")
+            continue
+        if source == 'spelling':
+            print(f"Loaded {len(questions)} questions from {path}")
+        for i, q in enumerate(questions):
+            yield file_question_to_dict(q, path, i, source)
+
+def iter_unique_questions(questions):
+    """Yield questions whose fingerprint has not been seen yet"""
+    seen = set()
+    for q_dict in questions:
+        fingerprint = question_fingerprint(q_dict)
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            yield q_dict
+
+def build_all_questions(manifest: tuple = ()):
+    """Parse and deduplicate every question file; returns (questions, errors)"""
+    errors = []
+    
+    # Real questions are cached separately, keyed on the real files only
+    real_manifest = tuple(entry for entry in manifest if entry[0] in REAL_QUESTION_FILES)
+    real_questions = load_real_matura_questions(real_manifest)
+    
+    # Load AI and spelling questions from ai-data folder
+    ai_files = glob.glob("ai-data/ai_questions_*.json")
     spelling_files = list(set(glob.glob("ai-data/*spelling*questions*.json") + glob.glob("ai-data/comprehensive_spelling*questions*.json")))
     print(f"Found spelling files: {spelling_files}")
-    for spelling_file in spelling_files:
-        try:
-            with open(spelling_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                spelling_questions = data.get('questions', [])
-                print(f"Loaded {len(spelling_questions)} questions from {spelling_file}")
-                
-                # Add spelling questions with metadata
-                for i, q in enumerate(spelling_questions):
-                    q_dict = {
-                        'id': f"spelling_{spelling_file}_{i}",
-                        'source': 'spelling',
-                        'question': q.get('question', 'N/A'),
-                        'options': q.get('options', []),
-                        'correct_answer': q.get('correct_answer', ''),
-                        'subject': 'Правопис',  # Set subject to "Правопис"
-                        'difficulty': q.get('difficulty', 'medium'),
-                        'points': q.get('points', 1),
-                        'category': q.get('category', 'правопис'),
-                        'question_type': q.get('question_type', ''),
-                        'common_error': q.get('common_error', ''),
-                        'correct_word': q.get('correct_word', ''),
-                        'wrong_word': q.get('wrong_word', '')
-                    }
-                    
-                    # Check for duplicates before adding
-                    if not is_duplicate_question(q_dict, all_questions):
-                        all_questions.append(q_dict)
-                    else:
-                        duplicates_removed += 1
-                    
-        except Exception as e:
-            st.error(f"Error loading {spelling_file}: {e}")
     
-    # Show duplicates removed info (hidden)
-    # if duplicates_removed > 0:
-    #     st.info(f"ℹ️ Премахнати {duplicates_removed} дублирани въпроси")
+    # File reads are I/O bound, so load them concurrently; dedup stays on this thread
+    with ThreadPoolExecutor(max_workers=MAX_LOAD_WORKERS) as executor:
+        ai_results = executor.map(load_questions_file, ai_files)
+        spelling_results = executor.map(load_questions_file, spelling_files)
+        
+        # One pass over every source, real questions first so they win over duplicates
+        all_questions = list(iter_unique_questions(itertools.chain(
+            real_questions,
+            iter_file_questions(ai_files, ai_results, 'ai_generated', errors),
+            iter_file_questions(spelling_files, spelling_results, 'spelling', errors)
+        )))
+    
+    return all_questions, errors
+
+def get_all_questions(manifest: tuple):
+    """Return the cached question list, showing any load errors"""
+    questions, errors = load_all_questions(manifest)
+    for error in errors:
+        st.error(error)
+    return questions
+
+@st.cache_data(show_spinner=False)
+def build_question_index(manifest: tuple, _questions: list):
+    """Subject list, per-subject question lists and per-source counts
     
-    return all_questions
+    Built once per set of question files so sidebar reruns only do lookups.
+    _questions is the list get_all_questions returned for manifest; the
+    underscore keeps st.cache_data from hashing it, manifest is the key.
+    """
+    by_subject = {ALL_SUBJECTS: _questions}
+    source_counts = Counter()
+    for q in _questions:
+        by_subject.setdefault(q.get('subject', 'Unknown'), []).append(q)
+        source_counts[q.get('source')] += 1
+    subjects = [ALL_SUBJECTS] + sorted(subject for subject in by_subject if subject != ALL_SUBJECTS)
+    return subjects, by_subject, source_counts
 
 def display_question(question, show_answer=False, question_index=None, compact_mode=False):
     """Display question in beautiful format"""
     # Show appropriate tag based on source (only in single mode)
     if not compact_mode:
-        if question.get('source') == 'ai_generated':
-            st.markdown('<div class="ai-generated-tag">🤖 AI Генериран</div>', unsafe_allow_html=True)
-        elif question.get('source') == 'spelling':
-            st.markdown('<div class="spelling-tag">✍️ Правопис</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="real-matura-tag">📚 Базиран на реална матура</div>', unsafe_allow_html=True)
+        render_source_tag(question.get('source'))
     
     # Question text - compact version for "show all" mode
     if compact_mode:
@@ -472,7 +246,9 @@ def display_question(question, show_answer=False, question_index=None, compact_m
         else:
             icon = "🤖"
             color_class = "ai"
+        # Separator and question card go out as one element
         st.markdown(f'''
+        <hr style="margin: 8px 0;">
         <div class="compact-question {color_class}">
             <strong>{icon} {question_index + 1}.</strong> {question.get('question', 'N/A')}
         </div>
@@ -495,30 +271,22 @@ def display_question(question, show_answer=False, question_index=None, compact_m
     # Display options
     options = question.get('options', [])
     if options:
-        if compact_mode:
-            st.markdown('<div class="compact-options">', unsafe_allow_html=True)
-        else:
+        # Each st.markdown is its own element, so the wrapper divs hold nothing;
+        # skip them in compact mode where they add two elements per question
+        if not compact_mode:
             st.markdown('<div class="options-box" style="margin: 4px 0;">', unsafe_allow_html=True)
             # st.markdown("**Изберете отговор:**", help="Кликнете върху опцията, която смятате за правилна")
         
-        # Create checkboxes for each option with enhanced styling
-        selected_options = []
-        for i, option in enumerate(options):
-            question_id = question.get('id', f"q_{question_index}")
-            if st.checkbox(f"{option}", key=f"option_{question_id}_{i}"):
-                selected_options.append(option)
+        # One single-select radio per question instead of a checkbox per option
+        question_id = question.get('id', f"q_{question_index}")
+        choice = st.radio("Изберете отговор:", options, index=None, key=f"option_{question_id}", label_visibility="collapsed")
         
-        st.markdown('</div>', unsafe_allow_html=True)
+        if not compact_mode:
+            st.markdown('</div>', unsafe_allow_html=True)
         
         # Automatic answer checking when option is selected
-        if selected_options:
-            correct_answer = question.get('correct_answer', '')
-            if correct_answer in selected_options:
-                st.success("✅ Правилен отговор!")
-            else:
-                st.error("❌ Грешен отговор!")
-                st.markdown(f"**Правилният отговор е:** {correct_answer}")
-                
+        if choice is not None:
+            if not render_answer_feedback(choice, question.get('correct_answer', '')):
                 # Show correct spelling for spelling questions
                 if question.get('category') == 'правопис' and question.get('correct_word'):
                     st.info(f"💡 **Правилно се пише:** {question.get('correct_word')}")
@@ -532,20 +300,57 @@ def display_question(question, show_answer=False, question_index=None, compact_m
         st.markdown(question.get('correct_answer', ''))
         st.markdown('</div>', unsafe_allow_html=True)
 
+@st.fragment
+def question_block(current_question, current_index):
+    """Options and answer check for the current question; clicks rerun only this block"""
+    options = current_question.get('options', [])
+    if options:
+        # st.markdown("**Изберете отговор:**")
+        
+        question_id = current_question.get('id', f"q_{current_index}")
+        choice = st.radio("Изберете отговор:", options, index=None, key=f"option_{question_id}", label_visibility="collapsed")
+        
+        # Automatic answer checking
+        if choice is not None:
+            render_answer_feedback(choice, current_question.get('correct_answer', ''))
+
+@st.fragment
+def render_question_page(questions, order):
+    """Render one page of the show-all list; paging reruns only this fragment"""
+    total_pages = max(1, math.ceil(len(order) / QUESTIONS_PER_PAGE))
+    page = min(st.session_state.get('page', 0), total_pages - 1)
+    
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("⬅️ Предишна", key="prev_page", disabled=page == 0):
+            st.session_state.page = page - 1
+            st.rerun(scope="fragment")
+    with col_page:
+        st.markdown(f'<div style="text-align: center;">Страница {page + 1} от {total_pages}</div>', unsafe_allow_html=True)
+    with col_next:
+        if st.button("➡️ Следваща", key="next_page", disabled=page >= total_pages - 1):
+            st.session_state.page = page + 1
+            st.rerun(scope="fragment")
+    
+    offset = page * QUESTIONS_PER_PAGE
+    for i, question_index in enumerate(order[offset:offset + QUESTIONS_PER_PAGE], start=offset):
+        display_question(questions[question_index], show_answer=False, question_index=i, compact_mode=True)
+
 def main():
     """Main app function"""
     st.title("📚 ДЗИ Матура Въпроси по БЕЛ")
     st.markdown("Въпроси от истински ДЗИ изпити + AI генерирани въпроси")
     st.markdown("---")
     
-    # Load all questions
-    if 'all_questions' not in st.session_state:
-        with st.spinner("Зареждане на въпроси..."):
-            st.session_state.all_questions = load_all_questions()
-            st.session_state.current_question_index = 0
-            st.session_state.show_all = False
-    
-    questions = st.session_state.all_questions
+    # Load all questions (cached across sessions and restarts)
+    manifest = get_question_files_manifest()
+    questions = get_all_questions(manifest)
+    if 'current_question_index' not in st.session_state:
+        st.session_state.current_question_index = 0
+        st.session_state.show_all = False
+    # One random generator per session for the random and shuffle buttons
+    if 'rng' not in st.session_state:
+        st.session_state.rng = random.Random()
     
     if not questions:
         st.error("❌ Няма намерени въпроси!")
@@ -559,23 +364,24 @@ def main():
         st.markdown("### 📊 Статистики")
         st.markdown(f"**Общо въпроси:** {len(questions)}")
         
-        real_count = len([q for q in questions if q.get('source') == 'real'])
-        ai_count = len([q for q in questions if q.get('source') == 'ai_generated'])
-        spelling_count = len([q for q in questions if q.get('source') == 'spelling'])
+        subjects, by_subject, source_counts = build_question_index(manifest, questions)
         
-        st.markdown(f"**Реални въпроси:** {real_count}")
-        st.markdown(f"**AI въпроси:** {ai_count}")
-        st.markdown(f"**Правописни въпроси:** {spelling_count}")
+        st.markdown(f"**Реални въпроси:** {source_counts['real']}")
+        st.markdown(f"**AI въпроси:** {source_counts['ai_generated']}")
+        st.markdown(f"**Правописни въпроси:** {source_counts['spelling']}")
         
         # Subject filter
-        subjects = list(set([q.get('subject', 'Unknown') for q in questions]))
-        selected_subject = st.selectbox("Филтър по предмет:", ["Всички"] + subjects)
+        selected_subject = st.selectbox("Филтър по предмет:", subjects)
         
         # Filter questions by subject
-        if selected_subject != "Всички":
-            filtered_questions = [q for q in questions if q.get('subject') == selected_subject]
-        else:
-            filtered_questions = questions
+        filtered_questions = by_subject[selected_subject]
+        
+        # Display order is an index list in session state; the cached lists are never mutated
+        order = st.session_state.get('order')
+        if st.session_state.get('last_subject') != selected_subject or order is None or len(order) != len(filtered_questions):
+            order = st.session_state.order = list(range(len(filtered_questions)))
+            st.session_state.last_subject = selected_subject
+            st.session_state.page = 0
         
         st.markdown(f"**Показвани въпроси:** {len(filtered_questions)}")
         
@@ -603,15 +409,13 @@ def main():
             
             with col2:
                 if st.button("🎲 Разбъркай въпросите", key="shuffle_all_questions"):
-                    import random
-                    random.shuffle(filtered_questions)
+                    st.session_state.order = st.session_state.rng.sample(range(len(filtered_questions)), len(filtered_questions))
+                    st.session_state.page = 0
                     st.rerun()
             
             st.markdown("---")
             
-            for i, question in enumerate(filtered_questions):
-                display_question(question, show_answer=False, question_index=i, compact_mode=True)
-                st.markdown("---")
+            render_question_page(filtered_questions, order)
     else:
         # Single question mode
         if not filtered_questions:
@@ -623,38 +427,16 @@ def main():
             st.session_state.current_question_index = 0
             current_index = 0
         
-        current_question = filtered_questions[current_index]
+        current_question = filtered_questions[order[current_index]]
         
         # Question display
         st.markdown(f"**{current_index + 1}.** **{current_question.get('question', 'N/A')}**")
         
         # Show appropriate tag
-        if current_question.get('source') == 'ai_generated':
-            st.markdown('<div class="ai-generated-tag">🤖 AI Генериран</div>', unsafe_allow_html=True)
-        elif current_question.get('source') == 'spelling':
-            st.markdown('<div class="spelling-tag">✍️ Правопис</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="real-matura-tag">📚 Базиран на реална матура</div>', unsafe_allow_html=True)
+        render_source_tag(current_question.get('source'))
         
         # Display options
-        options = current_question.get('options', [])
-        if options:
-            # st.markdown("**Изберете отговор:**")
-            
-            selected_options = []
-            for i, option in enumerate(options):
-                question_id = current_question.get('id', f"q_{current_index}")
-                if st.checkbox(f"{option}", key=f"option_{question_id}_{i}"):
-                    selected_options.append(option)
-            
-            # Automatic answer checking
-            if selected_options:
-                correct_answer = current_question.get('correct_answer', '')
-                if correct_answer in selected_options:
-                    st.success("✅ Правилен отговор!")
-                else:
-                    st.error("❌ Грешен отговор!")
-                    st.markdown(f"**Правилният отговор е:** {correct_answer}")
+        question_block(current_question, current_index)
         
         # Navigation
         col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
@@ -671,8 +453,7 @@ def main():
         
         with col3:
             if st.button("🔄 Разбъркай", key="shuffle_button"):
-                import random
-                random.shuffle(filtered_questions)
+                st.session_state.order = st.session_state.rng.sample(range(len(filtered_questions)), len(filtered_questions))
                 st.session_state.current_question_index = 0
                 st.rerun()
         
@@ -701,9 +482,4 @@ def main():
         # ''', unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    # Initialize random number generator
-    if 'rng' not in st.session_state:
-        import random
-        st.session_state.rng = random.Random()
-    
     main()
@@ -2,10 +2,16 @@
 Streamlit app for real DZI matura questions
 """
 import streamlit as st
+import math
 import random
-import json
 import os
-from src.real_matura_generator import RealMaturaGenerator, SubjectArea
+from collections import Counter
+from pathlib import Path
+
+import orjson
+
+from src.real_matura_generator import SubjectArea
+from src.matura_ui import REAL_MATURA_TAG, get_generator, inject_stylesheet, render_answer_feedback, render_source_tag
 
 # Page config
 st.set_page_config(
@@ -14,134 +20,34 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-/* Remove all borders and make design cleaner */
-.question-box {
-    background-color: #ffffff;
-    padding: 16px;
-    margin: 8px 0;
-    font-size: 16px;
-    line-height: 1.5;
-    border: none;
-    box-shadow: none;
-}
-
-.options-box {
-    background-color: #ffffff;
-    padding: 16px;
-    margin: 8px 0;
-    border: none;
-    box-shadow: none;
-}
-
-.answer-box {
-    background-color: #e8f5e8;
-    padding: 12px;
-    margin: 8px 0;
-    border: none;
-    box-shadow: none;
-}
-
-.real-matura-tag {
-    background-color: #4caf50;
-    color: white;
-    padding: 4px 8px;
-    border-radius: 4px;
-    font-size: 11px;
-    display: inline-block;
-    margin-bottom: 8px;
-    font-weight: 500;
-    border: none;
-}
-
-.ai-generated-tag {
-    background: linear-gradient(90deg, #FF6B6B, #4ECDC4);
-    color: white;
-    padding: 4px 8px;
-    border-radius: 4px;
-    font-size: 11px;
-    font-weight: bold;
-    display: inline-block;
-    margin-bottom: 8px;
-}
-
-.context-text {
-    background-color: #fff3e0;
-    padding: 12px;
-    margin: 8px 0;
-    border: none;
-    box-shadow: none;
-    font-size: 14px;
-}
-
-/* Remove all borders from Streamlit elements */
-.stCheckbox > label > div[data-testid="stMarkdownContainer"] {
-    border: none !important;
-}
-
-.stCheckbox > label {
-    border: none !important;
-    box-shadow: none !important;
-}
-
-.stButton > button {
-    border: 1px solid #d1d5db !important;
-    box-shadow: none !important;
-}
-
-/* Remove extra spacing and make more compact */
-.stMarkdown h3 {
-    margin-top: 0.2rem;
-    margin-bottom: 0.2rem;
-    font-size: 18px;
-}
-
-.stMarkdown p {
-    margin-bottom: 0.2rem;
-}
-
-/* Reduce spacing in checkboxes */
-.stCheckbox {
-    margin-bottom: 0.1rem;
-}
-
-/* Reduce spacing in success/error messages */
-.stSuccess, .stError {
-    margin-top: 0.2rem;
-    margin-bottom: 0.2rem;
-}
-
-/* Remove borders from all containers */
-div[data-testid="stVerticalBlock"] {
-    border: none !important;
-}
-
-div[data-testid="stHorizontalBlock"] {
-    border: none !important;
-}
+# Styles live in assets/real_matura_old.css
+STYLE_FILE = Path(__file__).parent / "assets" / "real_matura_old.css"
+inject_stylesheet(STYLE_FILE)
 
-/* Full width for show all mode */
-.main .block-container {
-    max-width: 100% !important;
-    padding-left: 1rem !important;
-    padding-right: 1rem !important;
-}
+AI_QUESTIONS_FILE = "generated_questions_export.json"
+QUESTIONS_PER_PAGE = 5
 
-/* Better spacing for show all questions */
-.stContainer {
-    width: 100% !important;
-}
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data(ttl=24 * 60 * 60)
+def load_real_questions():
+    """Real exam questions parsed by the shared generator
+    
+    The generator reads the files in its constructor; calling its
+    load_real_questions() again would append a second copy.
+    """
+    return get_generator().questions_data
 
 def initialize_session_state():
     """Initialize session state variables"""
     if 'generator' not in st.session_state:
-        st.session_state.generator = RealMaturaGenerator()
+        st.session_state.generator = get_generator()
     if 'generated_questions' not in st.session_state:
         st.session_state.generated_questions = []
+    if 'subject_counts' not in st.session_state:
+        st.session_state.subject_counts = Counter()
+    if 'question_type_values' not in st.session_state:
+        st.session_state.question_type_values = []
+    if 'rng' not in st.session_state:
+        st.session_state.rng = random.Random()
     if 'current_question_index' not in st.session_state:
         st.session_state.current_question_index = 0
     if 'show_all' not in st.session_state:
@@ -151,56 +57,79 @@ def initialize_session_state():
     if 'all_questions' not in st.session_state:
         st.session_state.all_questions = []
 
-def load_ai_generated_questions():
-    """Load AI generated questions from export file"""
+@st.cache_data(ttl=24 * 60 * 60)
+def _load_ai_generated_questions(mtime: float):
+    """Load AI generated questions from export file; mtime only invalidates the cache"""
     try:
-        if os.path.exists("generated_questions_export.json"):
-            with open("generated_questions_export.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("questions", [])
+        if os.path.exists(AI_QUESTIONS_FILE):
+            return orjson.loads(Path(AI_QUESTIONS_FILE).read_bytes()).get("questions", [])
     except Exception as e:
         st.error(f"Error loading AI questions: {e}")
     return []
 
+def load_ai_generated_questions():
+    """Cached AI generated questions, re-read when the export file changes"""
+    mtime = os.path.getmtime(AI_QUESTIONS_FILE) if os.path.exists(AI_QUESTIONS_FILE) else 0.0
+    return _load_ai_generated_questions(mtime)
+
+class DisplayQuestion:
+    """Question dict exposed with the same attributes as a generated Question
+    
+    Only references to the dict's values are kept, and __slots__ avoids a
+    per-instance dict, so merging adds no copy of the question data.
+    """
+    __slots__ = ('id', 'source', 'question_text', 'options', 'correct_answer', 'context_texts', 'explanation')
+    
+    def __init__(self, q, question_id, source):
+        self.id = question_id
+        self.source = source
+        self.question_text = q.get('question', 'N/A')
+        self.options = q.get('options', [])
+        self.correct_answer = q.get('correct_answer', '')
+        self.context_texts = None
+        self.explanation = None
+
 def merge_questions(real_questions, ai_questions):
-    """Merge real and AI generated questions"""
+    """Merge real and AI generated questions
+    
+    Dicts are normalized here, once, so rendering only uses attribute access.
+    """
     all_questions = []
     
     # Add real questions first (if available)
     if real_questions:
         for i, q in enumerate(real_questions):
-            q_copy = q.copy()
-            q_copy['id'] = f"real_{i}"
-            q_copy['source'] = 'real'
-            all_questions.append(q_copy)
+            all_questions.append(DisplayQuestion(q, f"real_{i}", 'real'))
     
     # Add AI generated questions (if available)
     if ai_questions:
         for i, q in enumerate(ai_questions):
-            q_copy = q.copy()
-            q_copy['id'] = f"ai_{i}"
-            q_copy['source'] = 'ai_generated'
-            all_questions.append(q_copy)
+            all_questions.append(DisplayQuestion(q, f"ai_{i}", 'ai_generated'))
     
     return all_questions
 
+def answer_form(key, options):
+    """Options radio inside a form, so picking an option does not rerun the script
+    
+    Returns the chosen option once "Провери" has been pressed, otherwise None.
+    """
+    with st.form(f"q_form_{key}"):
+        choice = st.radio("Изберете отговор:", options, index=None, key=f"option_{key}", label_visibility="collapsed")
+        submitted = st.form_submit_button("Провери")
+    if submitted:
+        st.session_state[f"checked_{key}"] = True
+    if st.session_state.get(f"checked_{key}"):
+        return choice
+    return None
+
 def display_question(question, show_answer=False, question_index=None):
     """Display question in beautiful format"""
     # Show appropriate tag based on source
-    if isinstance(question, dict) and question.get('source') == 'ai_generated':
-        st.markdown('<div class="ai-generated-tag">🤖 AI Генериран</div>', unsafe_allow_html=True)
-    else:
-        st.markdown('<div class="real-matura-tag">📚 Базиран на реална матура</div>', unsafe_allow_html=True)
+    render_source_tag(getattr(question, 'source', 'real'))
     
-    # Handle both dict and object formats
-    if isinstance(question, dict):
-        question_text = question.get('question', 'N/A')
-        options = question.get('options', [])
-        correct_answer = question.get('correct_answer', '')
-    else:
-        question_text = question.question_text
-        options = question.options
-        correct_answer = question.correct_answer
+    question_text = question.question_text
+    options = question.options
+    correct_answer = question.correct_answer
     
     st.markdown(f'''
     <div class="question-box">
@@ -209,7 +138,7 @@ def display_question(question, show_answer=False, question_index=None):
     ''', unsafe_allow_html=True)
     
     # Display context texts if available (only for real questions)
-    if not isinstance(question, dict) and hasattr(question, 'context_texts') and question.context_texts:
+    if question.context_texts:
         st.markdown("### 📄 Контекстни текстове")
         for text_key, text_content in question.context_texts.items():
             st.markdown(f'<div class="context-text"><strong>{text_key}:</strong><br>{text_content}</div>', unsafe_allow_html=True)
@@ -218,25 +147,15 @@ def display_question(question, show_answer=False, question_index=None):
         st.markdown('<div class="options-box">', unsafe_allow_html=True)
         st.markdown("**Изберете отговор:**")
         
-        # Create checkboxes for each option with unique keys
-        selected_options = []
-        for i, option in enumerate(options):
-            # Use question_index for unique keys
-            key_suffix = f"_{question_index}" if question_index is not None else ""
-            question_id = question.get('id', f"q_{question_index}") if isinstance(question, dict) else question.id
-            if st.checkbox(f"{option}", key=f"option_{question_id}_{i}{key_suffix}"):
-                selected_options.append(option)
+        # One single-select radio per question, with a unique key
+        key_suffix = f"_{question_index}" if question_index is not None else ""
+        choice = answer_form(f"{question.id}{key_suffix}", options)
         
         st.markdown('</div>', unsafe_allow_html=True)
         
         # Automatic answer checking when option is selected
-        if selected_options:
-            # Check if selected answer is correct
-            if correct_answer in selected_options:
-                st.success("✅ Правилен отговор!")
-            else:
-                st.error("❌ Грешен отговор!")
-                st.markdown(f"**Правилният отговор е:** {correct_answer}")
+        if choice is not None:
+            render_answer_feedback(choice, correct_answer)
     
     if show_answer and correct_answer:
         st.markdown('<div class="answer-box">', unsafe_allow_html=True)
@@ -244,10 +163,34 @@ def display_question(question, show_answer=False, question_index=None):
         st.markdown(correct_answer)
         st.markdown('</div>', unsafe_allow_html=True)
     
-    if show_answer and not isinstance(question, dict) and hasattr(question, 'explanation') and question.explanation:
+    if show_answer and question.explanation:
         st.markdown("**Обяснение:**")
         st.markdown(question.explanation)
 
+@st.fragment
+def render_question(current_question, current_index):
+    """Single-question view; submitting an answer reruns only this block"""
+    question_text = current_question.question_text
+    options = current_question.options
+    correct_answer = current_question.correct_answer
+    
+    # Question display - clean version
+    st.markdown(f"**{current_index + 1}.** **{question_text}**")
+    
+    # Show appropriate tag based on source
+    render_source_tag(getattr(current_question, 'source', 'real'))
+    
+    # Display options if available
+    if options:
+        st.markdown("**Изберете отговор:**")
+        
+        # One single-select radio per question
+        choice = answer_form(current_question.id, options)
+        
+        # Automatic answer checking when option is selected
+        if choice is not None:
+            render_answer_feedback(choice, correct_answer)
+
 def main():
     """Main app function"""
     initialize_session_state()
@@ -258,12 +201,12 @@ def main():
         if ai_questions:
             st.session_state.ai_questions = ai_questions
             # Get real questions safely
-            real_questions = st.session_state.generator.load_real_questions()
+            real_questions = load_real_questions()
             st.session_state.all_questions = merge_questions(real_questions, ai_questions)
     
     st.title("📚 Реални ДЗИ Въпроси по БЕЛ")
     st.markdown("Въпроси от истински ДЗИ изпити")
-    st.markdown("---")
+    st.divider()
     
     # Sidebar for controls
     with st.sidebar:
@@ -284,7 +227,7 @@ def main():
             if ai_questions:
                 st.session_state.ai_questions = ai_questions
                 # Get real questions safely
-                real_questions = st.session_state.generator.load_real_questions()
+                real_questions = load_real_questions()
                 st.session_state.all_questions = merge_questions(real_questions, ai_questions)
                 st.success(f"✅ Импортирани {len(ai_questions)} AI въпроса!")
                 st.rerun()
@@ -296,11 +239,13 @@ def main():
             if subject == "Всички":
                 questions = st.session_state.generator.generate_questions(count)
             elif subject == "Български език":
-                questions = st.session_state.generator.get_questions_by_subject(SubjectArea.LANGUAGE)[:count]
+                questions = st.session_state.generator.get_questions_by_subject(SubjectArea.LANGUAGE, limit=count)
             else:  # Literature
-                questions = st.session_state.generator.get_questions_by_subject(SubjectArea.LITERATURE)[:count]
+                questions = st.session_state.generator.get_questions_by_subject(SubjectArea.LITERATURE, limit=count)
             
             st.session_state.generated_questions = questions
+            st.session_state.subject_counts = Counter(q.subject_area for q in questions)
+            st.session_state.question_type_values = sorted({q.question_type.value for q in questions})
             st.session_state.current_question_index = 0
             st.session_state.show_all = False
             st.rerun()
@@ -320,8 +265,9 @@ def main():
             st.markdown("### 📊 Статистики")
             st.markdown(f"**Общо въпроси:** {len(st.session_state.generated_questions)}")
             
-            language_count = len([q for q in st.session_state.generated_questions if q.subject_area == SubjectArea.LANGUAGE])
-            literature_count = len([q for q in st.session_state.generated_questions if q.subject_area == SubjectArea.LITERATURE])
+            # Counted once when the question set changes
+            language_count = st.session_state.subject_counts.get(SubjectArea.LANGUAGE, 0)
+            literature_count = st.session_state.subject_counts.get(SubjectArea.LITERATURE, 0)
             
             st.markdown(f"**Български език:** {language_count}")
             st.markdown(f"**Литература:** {literature_count}")
@@ -337,6 +283,12 @@ def main():
     else:
         questions = st.session_state.generated_questions
     
+    # Display order is a list of indices; reset whenever a new question list is shown
+    if st.session_state.get('order_source') is not questions:
+        st.session_state.order = list(range(len(questions)))
+        st.session_state.order_source = questions
+    order = st.session_state.order
+    
     # Show all questions mode
     if st.session_state.show_all:
         # Full width container for all questions
@@ -348,82 +300,43 @@ def main():
                 st.session_state.show_all = False
                 st.rerun()
             
-            st.markdown("---")
+            st.divider()
             
-            # Display all questions with improved design
-            for i, question in enumerate(questions):
+            # Display one page of questions with improved design
+            total_pages = max(1, math.ceil(len(questions) / QUESTIONS_PER_PAGE))
+            page = st.number_input("Страница:", min_value=1, max_value=total_pages, value=1, key="show_all_page")
+            st.caption(f"Страница {page} от {total_pages}")
+            offset = (page - 1) * QUESTIONS_PER_PAGE
+            for i, question_index in enumerate(order[offset:offset + QUESTIONS_PER_PAGE], start=offset):
+                question = questions[question_index]
                 # Question container with full width
                 with st.container():
-                    # Question header - clean version
-                    st.markdown(f"**{i+1}.** **{question.question_text}**")
-                    
-                    # Real matura tag
-                    st.markdown('<div class="real-matura-tag">📚 Базиран на реална матура</div>', unsafe_allow_html=True)
+                    # Question header, real matura tag and options prompt as one element
+                    header = (
+                        f'<p><strong>{i+1}. {question.question_text}</strong></p>'
+                        + REAL_MATURA_TAG
+                    )
+                    if question.options:
+                        header += '<p><strong>Изберете отговор:</strong></p>'
+                    st.html(header)
                     
                     # Display options if available
                     if question.options:
-                        st.markdown("**Изберете отговор:**")
-                        
-                        # Create checkboxes for each option
-                        selected_options = []
-                        for j, option in enumerate(question.options):
-                            if st.checkbox(f"{option}", key=f"option_all_{question.id}_{j}"):
-                                selected_options.append(option)
+                        # One single-select radio per question
+                        choice = answer_form(f"all_{question.id}", question.options)
                         
                         # Automatic answer checking when option is selected
-                        if selected_options:
-                            # Check if selected answer is correct
-                            if question.correct_answer in selected_options:
-                                st.success("✅ Правилен отговор!")
-                            else:
-                                st.error("❌ Грешен отговор!")
-                                st.markdown(f"**Правилният отговор е:** {question.correct_answer}")
+                        if choice is not None:
+                            render_answer_feedback(choice, question.correct_answer)
                     
-                    st.markdown("---")
+                    st.divider()
         return
     
     # Single question mode
     current_index = st.session_state.current_question_index
-    current_question = questions[current_index]
+    current_question = questions[order[current_index]]
     
-    # Handle both dict and object formats
-    if isinstance(current_question, dict):
-        question_text = current_question.get('question', 'N/A')
-        options = current_question.get('options', [])
-        correct_answer = current_question.get('correct_answer', '')
-    else:
-        question_text = current_question.question_text
-        options = current_question.options
-        correct_answer = current_question.correct_answer
-    
-    # Question display - clean version
-    st.markdown(f"**{current_index + 1}.** **{question_text}**")
-    
-    # Show appropriate tag based on source
-    if isinstance(current_question, dict) and current_question.get('source') == 'ai_generated':
-        st.markdown('<div class="ai-generated-tag">🤖 AI Генериран</div>', unsafe_allow_html=True)
-    else:
-        st.markdown('<div class="real-matura-tag">📚 Базиран на реална матура</div>', unsafe_allow_html=True)
-    
-    # Display options if available
-    if options:
-        st.markdown("**Изберете отговор:**")
-        
-        # Create checkboxes for each option
-        selected_options = []
-        for i, option in enumerate(options):
-            question_id = current_question.get('id', f"q_{current_index}") if isinstance(current_question, dict) else current_question.id
-            if st.checkbox(f"{option}", key=f"option_{question_id}_{i}"):
-                selected_options.append(option)
-        
-        # Automatic answer checking when option is selected
-        if selected_options:
-            # Check if selected answer is correct
-            if correct_answer in selected_options:
-                st.success("✅ Правилен отговор!")
-            else:
-                st.error("❌ Грешен отговор!")
-                st.markdown(f"**Правилният отговор е:** {correct_answer}")
+    render_question(current_question, current_index)
     
     # Navigation
     col1, col2, col3 = st.columns([1, 1, 1])
@@ -442,16 +355,16 @@ def main():
     
     with col3:
         if st.button("🎲 Случаен", key="random_button"):
-            st.session_state.current_question_index = random.randint(0, len(questions) - 1)
+            st.session_state.current_question_index = st.session_state.rng.randrange(len(questions))
             st.rerun()
     
     # Additional controls
-    st.markdown("---")
+    st.divider()
     col1, col2, col3 = st.columns(3)
     
     with col1:
         if st.button("🔀 Разбъркай въпроси", key="shuffle_button"):
-            random.shuffle(st.session_state.generated_questions)
+            st.session_state.rng.shuffle(st.session_state.order)
             st.session_state.current_question_index = 0
             st.rerun()
     
@@ -461,15 +374,18 @@ def main():
             st.rerun()
     
     with col3:
-        if st.button("🎯 Филтрирай по тип", key="filter_button"):
-            question_types = list(set([q.type.value for q in questions]))
-            selected_type = st.selectbox("Изберете тип:", question_types, key="type_selector")
+        # Only generated questions have a type; the merged list (DisplayQuestion) does not
+        if questions is st.session_state.generated_questions:
+            if st.button("🎯 Филтрирай по тип", key="filter_button"):
+                selected_type = st.selectbox("Изберете тип:", st.session_state.question_type_values, key="type_selector")
             
-            filtered_questions = [q for q in questions if q.type.value == selected_type]
-            if filtered_questions:
-                st.session_state.generated_questions = filtered_questions
-                st.session_state.current_question_index = 0
-                st.rerun()
+                filtered_questions = [q for q in st.session_state.generated_questions if q.question_type.value == selected_type]
+                if filtered_questions:
+                    st.session_state.generated_questions = filtered_questions
+                    st.session_state.subject_counts = Counter(q.subject_area for q in filtered_questions)
+                    st.session_state.question_type_values = sorted({q.question_type.value for q in filtered_questions})
+                    st.session_state.current_question_index = 0
+                    st.rerun()
 
 if __name__ == "__main__":
     main()
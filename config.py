@@ -6,6 +6,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Settings are read from the environment once, here; import them from config
+# rather than calling os.getenv again elsewhere
+
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your_openai_api_key_here")
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "your_huggingface_api_key_here")
@@ -26,7 +29,7 @@ CHUNK_OVERLAP = 200
 TOP_K_RESULTS = 5
 
 # Bulgarian DZU subjects
-DZU_SUBJECTS = [
+DZU_SUBJECTS = (
     "Български език и литература",
     "Математика", 
     "История",
@@ -39,7 +42,7 @@ DZU_SUBJECTS = [
     "Френски език",
     "Руски език",
     "Информатика"
-]
+)
 
 # File paths
 DATA_DIR = "data"
@@ -2,19 +2,31 @@
 """
 Поправка на PDF парсера за по-добро извличане на въпроси
 """
+import os
 import re
-import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import orjson
+
+from src.parser_common import SKIP_QUESTION_NUMBERS, extract_answers_from_text, link_answers
+
+# Регулярни изрази, компилирани веднъж при зареждане на модула
+ADMIN_NOTE_RE = re.compile(r'до \d+\. включително отбелязвайте в листа за отговори\.?\s*')
+MINISTRY_HEADER_RE = re.compile(r'МИНИСТЕРСТВО НА ОБРАЗОВАНИЕТО И НАУКАТА.*?ЧАСТ \d+.*?Време за работа.*?', re.DOTALL)
+ANSWER_SHEET_NOTE_RE = re.compile(r'Отговорите на задачите от \d+\. до \d+\. включително отбелязвайте в листа за отговори\.\s*')
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+MULTIPLE_CHOICE_RE = re.compile(r'(\d+)\.\s*([^А-Г]+?)\s*А\)\s*([^\n]+?)\s*Б\)\s*([^\n]+?)\s*В\)\s*([^\n]+?)\s*Г\)\s*([^\n]+?)(?=\n\s*\d+\.|$)', re.DOTALL)
+
 def clean_question_text(text):
     """Почиства въпроса от излишни части"""
     # Премахваме административни части
-    text = re.sub(r'до \d+\. включително отбелязвайте в листа за отговори\.?\s*', '', text)
-    text = re.sub(r'МИНИСТЕРСТВО НА ОБРАЗОВАНИЕТО И НАУКАТА.*?ЧАСТ \d+.*?Време за работа.*?', '', text, flags=re.DOTALL)
-    text = re.sub(r'Отговорите на задачите от \d+\. до \d+\. включително отбелязвайте в листа за отговори\.\s*', '', text)
+    text = ADMIN_NOTE_RE.sub('', text)
+    text = MINISTRY_HEADER_RE.sub('', text)
+    text = ANSWER_SHEET_NOTE_RE.sub('', text)
     
     # Почистваме излишни нови редове и интервали
-    text = re.sub(r'\n\s*\n', '\n', text)
+    text = BLANK_LINES_RE.sub('\n', text)
     text = text.strip()
     
     return text
@@ -24,23 +36,13 @@ def extract_multiple_choice_questions(text):
     questions = []
     
     # Подобрен патърн за множествен избор с български букви
-    pattern = r'(\d+)\.\s*([^А-Г]+?)\s*А\)\s*([^\n]+?)\s*Б\)\s*([^\n]+?)\s*В\)\s*([^\n]+?)\s*Г\)\s*([^\n]+?)(?=\n\s*\d+\.|$)'
-    
-    matches = re.findall(pattern, text, re.DOTALL)
+    matches = MULTIPLE_CHOICE_RE.findall(text)
     for match in matches:
         question_num, question_text, option_a, option_b, option_c, option_d = match
         question_number = int(question_num.strip())
         
         # Пропускаме проблематичните въпроси
-        if question_number in [14, 15, 16, 17, 18, 19, 20, 21, 40, 41]:
-            continue
-        
-        # Пропускаме въпроси, които изискват контекстни текстове
-        if question_number in range(14, 22):
-            continue
-        
-        # Пропускаме въпроси с отворен отговор
-        if question_number in [40, 41]:
+        if question_number in SKIP_QUESTION_NUMBERS:
             continue
         
         # Почистваме въпроса
@@ -65,35 +67,30 @@ def extract_multiple_choice_questions(text):
     
     return questions
 
-def extract_answers_from_text(text):
-    """Извлича отговори от текст по-добро"""
-    answers = {}
-    
-    # Търсим отговори в различни формати
-    answer_patterns = [
-        r'(\d+)\s*[\.:]\s*([А-Г])\s*',
-        r'(\d+)\s*[\.:]\s*([A-D])\s*',
-        r'(\d+)\s+([А-Г])\s+',
-        r'(\d+)\s+([A-D])\s+',
-        r'Въпрос\s*(\d+)\s*[\.:]\s*([А-Г])',
-        r'Въпрос\s*(\d+)\s*[\.:]\s*([A-D])'
-    ]
-    
-    for pattern in answer_patterns:
-        matches = re.findall(pattern, text, re.MULTILINE)
-        for match in matches:
-            question_num, answer = match
-            answers[question_num.strip()] = answer.strip()
-    
-    return answers
+def reextract_full_text(file_name):
+    """Извлича наново пълния текст на PDF файла; връща None при неуспех"""
+    pdf_path = f"tests/{file_name}"
+    # Проверяваме за файла преди тежкия импорт на PDF библиотеките
+    if not Path(pdf_path).exists():
+        print(f"PDF файлът не съществува: {pdf_path}")
+        return None
+    
+    from src.pdf_processor import MaturaPDFProcessor
+    full_text = MaturaPDFProcessor().extract_text_from_pdf(pdf_path)
+    if not full_text:
+        print("Не може да се извлече пълен текст от PDF")
+        return None
+    
+    print(f"Извлечен пълен текст с дължина: {len(full_text)}")
+    return full_text
 
 def fix_json_file(input_path, output_path):
     """Поправя JSON файл с по-добро парсиране"""
     print(f"Поправяне на файл: {input_path}")
     
     # Зареждаме оригиналните данни
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(input_path, 'rb') as f:
+        data = orjson.loads(f.read())
     
     # Извличаме суровия текст - използваме пълния текст, не само първите 1000 символа
     raw_text = data.get('raw_text', '')
@@ -104,53 +101,35 @@ def fix_json_file(input_path, output_path):
     # Ако текстът е скъсен, опитваме да го извлечем отново от PDF
     if len(raw_text) < 2000:  # Твърде кратък
         print("Суровият текст е твърде кратък, опитваме се да го извлечем отново...")
-        from src.pdf_processor import MaturaPDFProcessor
-        processor = MaturaPDFProcessor()
-        pdf_path = f"tests/{data['metadata']['file_name']}"
-        if Path(pdf_path).exists():
-            full_text = processor.extract_text_from_pdf(pdf_path)
-            if full_text:
-                raw_text = full_text
-                print(f"Извлечен пълен текст с дължина: {len(raw_text)}")
-            else:
-                print("Не може да се извлече пълен текст от PDF")
-                return
-        else:
-            print(f"PDF файлът не съществува: {pdf_path}")
+        raw_text = reextract_full_text(data['metadata']['file_name'])
+        if not raw_text:
             return
     
     # Извличаме въпроси с множествен избор
     mc_questions = extract_multiple_choice_questions(raw_text)
     
-    # Извличаме отговори
-    answers = extract_answers_from_text(raw_text)
+    # Извличаме отговори само ако има въпроси, към които да ги свържем
+    answers = extract_answers_from_text(raw_text) if mc_questions else {}
     
     # Свързваме въпроси с отговори
-    for question in mc_questions:
-        if question['number'] in answers:
-            answer = answers[question['number']]
-            # Мапираме буквите към опциите
-            if answer in ['А', 'A']:
-                question['correct_answer'] = question['options'][0]
-            elif answer in ['Б', 'B']:
-                question['correct_answer'] = question['options'][1]
-            elif answer in ['В', 'C']:
-                question['correct_answer'] = question['options'][2]
-            elif answer in ['Г', 'D']:
-                question['correct_answer'] = question['options'][3]
+    link_answers(mc_questions, answers)
     
     # Запазваме поправените данни
     data['questions'] = mc_questions
     data['metadata']['total_questions'] = len(mc_questions)
     data['metadata']['multiple_choice_count'] = len(mc_questions)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     
     print(f"Поправените данни са запазени в: {output_path}")
     print(f"Намерени {len(mc_questions)} въпроса с множествен избор")
 
 if __name__ == "__main__":
-    # Поправяме двата файла
-    fix_json_file('data/matura_21_05_2025.json', 'data/matura_21_05_2025_fixed.json')
-    fix_json_file('data/matura_2025_avgust.json', 'data/matura_2025_avgust_fixed.json')
+    # Поправяме двата файла паралелно; всеки записва собствения си изход
+    input_files = ['data/matura_21_05_2025.json', 'data/matura_2025_avgust.json']
+    output_files = ['data/matura_21_05_2025_fixed.json', 'data/matura_2025_avgust_fixed.json']
+    
+    with ProcessPoolExecutor(max_workers=min(len(input_files), os.cpu_count() or 1)) as executor:
+        # list() изчаква всички задачи и показва изключенията им
+        list(executor.map(fix_json_file, input_files, output_files))
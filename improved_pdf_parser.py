@@ -2,94 +2,53 @@
 """
 Подобрен PDF парсер за извличане на повече въпроси
 """
+import argparse
+import os
 import re
-import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+
+import orjson
+
+from src.parser_common import SKIP_QUESTION_NUMBERS, extract_answers_from_text, link_answers
 from src.pdf_processor import MaturaPDFProcessor
 
+# Регулярни изрази, компилирани веднъж при зареждане на модула
+# Ред "N. текст" и ред "А) текст"; [^\S\n] е интервал без нов ред, а краищата
+# на реда се изрязват както при line.strip()
+QUESTION_HEADER_RE = re.compile(r'^[^\S\n]*(\d+)\.[^\S\n]*(\S[^\n]*?)[^\S\n]*$', re.MULTILINE)
+OPTION_LINE_RE = re.compile(r'^[^\S\n]*[А-Г]\)[^\S\n]*(\S[^\n]*?)[^\S\n]*$', re.MULTILINE)
+
 def extract_all_questions(text):
     """Извлича всички въпроси от текста"""
     questions = []
     
-    # Разделяме текста на редове
-    lines = text.split('\n')
-    
-    current_question = None
-    current_options = []
-    question_number = None
+    # Намираме началата на въпросите с един regex вместо обхождане ред по ред
+    headers = list(QUESTION_HEADER_RE.finditer(text))
     
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
+    for i, header in enumerate(headers):
+        question_number = int(header.group(1))
+        
+        # Пропускаме проблематичните въпроси
+        if not question_number or question_number in SKIP_QUESTION_NUMBERS:
             continue
         
-        # Търсим начало на въпрос
-        question_match = re.match(r'^(\d+)\.\s*(.+)$', line)
-        if question_match:
-            # Ако имаме предходен въпрос, го запазваме
-            if current_question and question_number:
-                if len(current_options) >= 4:  # Само ако има достатъчно опции
-                    questions.append({
-                        'type': 'multiple_choice',
-                        'number': str(question_number),
-                        'question': current_question,
-                        'options': current_options,
-                        'correct_answer': None,
-                        'points': 1
-                    })
-            
-            # Започваме нов въпрос
-            question_number = int(question_match.group(1))
-            current_question = question_match.group(2).strip()
-            current_options = []
-            
-            # Пропускаме проблематичните въпроси
-            if question_number in [14, 15, 16, 17, 18, 19, 20, 21, 40, 41]:
-                current_question = None
-                question_number = None
-                continue
+        # Опциите (А), Б), В), Г)) са редовете до началото на следващия въпрос
+        block_end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        options = OPTION_LINE_RE.findall(text, header.end(), block_end)
         
-        # Търсим опции (А), Б), В), Г))
-        elif current_question and question_number:
-            option_match = re.match(r'^([А-Г])\)\s*(.+)$', line)
-            if option_match:
-                current_options.append(option_match.group(2).strip())
-    
-    # Запазваме последния въпрос
-    if current_question and question_number and len(current_options) >= 4:
-        questions.append({
-            'type': 'multiple_choice',
-            'number': str(question_number),
-            'question': current_question,
-            'options': current_options,
-            'correct_answer': None,
-            'points': 1
-        })
+        if len(options) >= 4:  # Само ако има достатъчно опции
+            questions.append({
+                'type': 'multiple_choice',
+                'number': str(question_number),
+                'question': header.group(2),
+                'options': options,
+                'correct_answer': None,
+                'points': 1
+            })
     
     return questions
 
-def extract_answers_from_text(text):
-    """Извлича отговори от текст"""
-    answers = {}
-    
-    # Търсим отговори в различни формати
-    answer_patterns = [
-        r'(\d+)\s*[\.:]\s*([А-Г])\s*',
-        r'(\d+)\s*[\.:]\s*([A-D])\s*',
-        r'(\d+)\s+([А-Г])\s+',
-        r'(\d+)\s+([A-D])\s+',
-        r'Въпрос\s*(\d+)\s*[\.:]\s*([А-Г])',
-        r'Въпрос\s*(\d+)\s*[\.:]\s*([A-D])'
-    ]
-    
-    for pattern in answer_patterns:
-        matches = re.findall(pattern, text, re.MULTILINE)
-        for match in matches:
-            question_num, answer = match
-            answers[question_num.strip()] = answer.strip()
-    
-    return answers
-
 def process_pdf_file(pdf_path):
     """Обработва PDF файл"""
     print(f"Обработване на файл: {pdf_path}")
@@ -108,18 +67,7 @@ def process_pdf_file(pdf_path):
     answers = extract_answers_from_text(text)
     
     # Свързваме въпроси с отговори
-    for question in questions:
-        if question['number'] in answers:
-            answer = answers[question['number']]
-            # Мапираме буквите към опциите
-            if answer in ['А', 'A']:
-                question['correct_answer'] = question['options'][0]
-            elif answer in ['Б', 'B']:
-                question['correct_answer'] = question['options'][1]
-            elif answer in ['В', 'C']:
-                question['correct_answer'] = question['options'][2]
-            elif answer in ['Г', 'D']:
-                question['correct_answer'] = question['options'][3]
+    link_answers(questions, answers)
     
     # Създаваме резултат
     result = {
@@ -139,7 +87,33 @@ def process_pdf_file(pdf_path):
     
     return result
 
-def main():
+def write_questions_columns(questions, output_file):
+    """Записва въпросите колона по колона (.npz) за векторизирана обработка
+    
+    Опциите са в един плосък масив; опциите на въпрос i са
+    options[option_offsets[i]:option_offsets[i + 1]]. correct_answer_idx е -1,
+    когато отговорът не е известен. Всички масиви са без object dtype, така че
+    файлът се чете с np.load без allow_pickle.
+    """
+    import numpy as np
+    
+    options = [option for question in questions for option in question['options']]
+    option_offsets = np.cumsum([0] + [len(question['options']) for question in questions], dtype=np.int32)
+    correct_answer_idx = [
+        question['options'].index(question['correct_answer'])
+        if question['correct_answer'] in question['options'] else -1
+        for question in questions
+    ]
+    np.savez(
+        output_file,
+        number=np.array([int(question['number']) for question in questions], dtype=np.int32),
+        question=np.array([question['question'] for question in questions], dtype=np.str_),
+        options=np.array(options, dtype=np.str_),
+        option_offsets=option_offsets,
+        correct_answer_idx=np.array(correct_answer_idx, dtype=np.int8),
+    )
+
+def main(columns=False):
     """Главна функция"""
     # Обработваме двата PDF файла
     pdf_files = [
@@ -147,19 +121,36 @@ def main():
         'tests/matura-po-bel-2025-avgust.pdf'
     ]
     
+    existing_files = []
     for pdf_file in pdf_files:
         if Path(pdf_file).exists():
-            result = process_pdf_file(pdf_file)
-            if result:
-                # Запазваме резултата
-                output_file = f"data/{Path(pdf_file).stem}_improved.json"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
-                
-                print(f"Обработени {len(result['questions'])} въпроси от {pdf_file}")
-                print(f"Запазени в: {output_file}")
+            existing_files.append(pdf_file)
         else:
             print(f"Файлът не съществува: {pdf_file}")
+    
+    if not existing_files:
+        return
+    
+    # Файловете са независими, затова ги обработваме паралелно в отделни процеси
+    workers = min(len(existing_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(process_pdf_file, existing_files))
+    
+    for pdf_file, result in zip(existing_files, results):
+        if result:
+            # Запазваме резултата
+            output_file = f"data/{Path(pdf_file).stem}_improved.json"
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+            if columns:
+                # Същите въпроси и в колонен вид, с редовете в същия ред
+                write_questions_columns(result['questions'], f"data/{Path(pdf_file).stem}_improved.npz")
+            
+            print(f"Обработени {len(result['questions'])} въпроси от {pdf_file}")
+            print(f"Запазени в: {output_file}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Извличане на въпроси от PDF файловете на матурите")
+    parser.add_argument("--columns", action="store_true", help="записва и колонен .npz файл за векторизирана обработка")
+    args = parser.parse_args()
+    main(columns=args.columns)
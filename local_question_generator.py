@@ -4,11 +4,17 @@ Generates new questions based on real matura data using RAG and OpenAI
 This is for local development only - not for deployment
 """
 import streamlit as st
+import hashlib
 import json
 import os
 import time
+from pathlib import Path
 from typing import List, Dict, Any
 
+import orjson
+
+from src.matura_ui import inject_stylesheet
+
 # Set page config
 st.set_page_config(
     page_title="🧠 Local AI Question Generator",
@@ -18,54 +24,12 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        color: #2E86AB;
-        margin-bottom: 2rem;
-    }
-    .generated-tag {
-        background: linear-gradient(90deg, #FF6B6B, #4ECDC4);
-        color: white;
-        padding: 4px 12px;
-        border-radius: 20px;
-        font-size: 12px;
-        font-weight: bold;
-        display: inline-block;
-        margin: 5px 0;
-    }
-    .question-box {
-        background: #f8f9fa;
-        border: 1px solid #dee2e6;
-        border-radius: 8px;
-        padding: 20px;
-        margin: 15px 0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .question-number {
-        font-size: 18px;
-        font-weight: bold;
-        color: #2E86AB;
-        margin-bottom: 10px;
-    }
-    .question-text {
-        font-size: 16px;
-        line-height: 1.6;
-        margin-bottom: 15px;
-    }
-    .option-item {
-        margin: 8px 0;
-        padding: 8px;
-        background: white;
-        border-radius: 4px;
-        border-left: 3px solid #4ECDC4;
-    }
-</style>
-""", unsafe_allow_html=True)
+STYLE_FILE = Path(__file__).parent / "assets" / "local_generator.css"
+inject_stylesheet(STYLE_FILE)
 
+@st.cache_data
 def load_real_questions():
-    """Load real matura questions from JSON files"""
+    """Load real matura questions from JSON files, parsed once and reused across reruns"""
     questions = []
     
     json_files = [
@@ -75,8 +39,8 @@ def load_real_questions():
     
     for file_path in json_files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
                 if isinstance(data, list):
                     questions.extend(data)
                 elif isinstance(data, dict) and 'questions' in data:
@@ -91,26 +55,25 @@ def load_real_questions():
 def display_question(question, index, show_checkboxes=True):
     """Display a single question with proper formatting"""
     with st.container():
-        st.markdown(f"""
+        # Question box and generated tag as one element; st.html skips the markdown parser
+        st.html(f"""
         <div class="question-box">
             <div class="question-number">Въпрос {index + 1}</div>
             <div class="question-text"><strong>{question.get('question', 'N/A')}</strong></div>
         </div>
-        """, unsafe_allow_html=True)
-        
-        # Show generated tag
-        st.markdown('<div class="generated-tag">🤖 AI Генериран</div>', unsafe_allow_html=True)
+        <div class="generated-tag">🤖 AI Генериран</div>
+        """)
         
         # Display options with checkboxes if available
         if question.get('options') and show_checkboxes:
             st.markdown("**Изберете отговор:**")
             selected_options = []
+            # Stable per question text, so a regenerated question at the same index starts unchecked
+            question_key = hashlib.blake2s(question.get('question', '').encode('utf-8'), digest_size=6).hexdigest()
             
             for j, option in enumerate(question['options']):
-                # Create a simple but unique key
-                unique_key = f"option_{index}_{j}_{int(time.time() * 1000000) % 1000000}"
-                
-                if st.checkbox(f"{option}", key=unique_key):
+                # Stable key, so the checkbox keeps its state across reruns
+                if st.checkbox(f"{option}", key=f"option_{index}_{question_key}_{j}"):
                     selected_options.append(option)
             
             # Automatic answer checking when option is selected
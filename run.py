@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Run one of the Streamlit apps in the current Python process
+Usage: python run.py --app app_real_matura.py --port 8502
+"""
+import argparse
+import sys
+
+def run_app(app, port, headless=None):
+    """Start a Streamlit app in this interpreter instead of spawning `python -m streamlit`"""
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", app, "--server.port", str(port)]
+    if headless is not None:
+        sys.argv += ["--server.headless", str(headless).lower()]
+    sys.exit(stcli.main())
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a DZI Streamlit app")
+    parser.add_argument("--app", default="app_real_matura.py", help="Streamlit script to run")
+    parser.add_argument("--port", type=int, default=8501, help="Server port")
+    args = parser.parse_args()
+
+    run_app(args.app, args.port)
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,7 @@ All Questions Viewer Runner
 Shows both real and generated questions in one interface
 """
 
-import subprocess
-import sys
-import os
+from run import run_app
 
 def main():
     print("📚 Starting All Questions Viewer...")
@@ -17,11 +15,7 @@ def main():
     
     try:
         # Run the all questions app
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", "app_all_questions.py",
-            "--server.port", "8508",
-            "--server.headless", "false"
-        ])
+        run_app("app_all_questions.py", 8508, headless=False)
     except KeyboardInterrupt:
         print("\n👋 App stopped by user")
     except Exception as e:
@@ -2,9 +2,7 @@
 Run Local AI Question Generator
 For local development only - generates questions using AI/RAG
 """
-import subprocess
-import sys
-import os
+from run import run_app
 
 def main():
     print("🧠 Starting Local AI Question Generator...")
@@ -14,11 +12,7 @@ def main():
     
     try:
         # Run the local generator
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", 
-            "local_question_generator.py", 
-            "--server.port", "8502"
-        ])
+        run_app("local_question_generator.py", 8502)
     except KeyboardInterrupt:
         print("\n🛑 Local generator stopped by user")
     except Exception as e:
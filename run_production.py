@@ -3,8 +3,7 @@ Run Production DZI Matura App
 Reads real questions + AI questions from ai-data folder
 No AI generation, no imports - just displays questions
 """
-import subprocess
-import sys
+from run import run_app
 
 def main():
     print("🚀 Starting Production DZI Matura App...")
@@ -14,11 +13,7 @@ def main():
     
     try:
         # Run the production app
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", 
-            "app_production.py", 
-            "--server.port", "8501"
-        ])
+        run_app("app_production.py", 8501)
     except KeyboardInterrupt:
         print("\n🛑 Production app stopped by user")
     except Exception as e:
@@ -2,9 +2,7 @@
 """
 Script to run the DZI Question Generator app
 """
-import subprocess
-import sys
-import os
+from run import run_app
 
 def main():
     """Run the question generator app"""
@@ -16,11 +14,7 @@ def main():
     
     try:
         # Run the Streamlit app
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", "app_questions.py",
-            "--server.port", "8501",
-            "--server.headless", "false"
-        ])
+        run_app("app_questions.py", 8501, headless=False)
     except KeyboardInterrupt:
         print("\n👋 App stopped by user")
     except Exception as e:
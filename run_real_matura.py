@@ -2,8 +2,7 @@
 """
 Script to run the Real Matura Questions app
 """
-import subprocess
-import sys
+from run import run_app
 
 def main():
     """Run the real matura questions app"""
@@ -15,11 +14,7 @@ def main():
     
     try:
         # Run the Streamlit app
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", "app_real_matura.py",
-            "--server.port", "8502",
-            "--server.headless", "false"
-        ])
+        run_app("app_real_matura.py", 8502, headless=False)
     except KeyboardInterrupt:
         print("\n👋 App stopped by user")
     except Exception as e:
@@ -7,10 +7,70 @@ import pickle
 import numpy as np
 import json
 import os
+import orjson
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
 from pathlib import Path
 
+@lru_cache(maxsize=8)
+def _parse_question_files(json_files: tuple, mtimes: tuple) -> tuple:
+    """Parse question JSON files once per (files, mtimes); mtimes only invalidate the memo"""
+    all_questions = []
+    for file_path in json_files:
+        try:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+            if isinstance(data, list):
+                all_questions.extend(data)
+            elif isinstance(data, dict) and 'questions' in data:
+                all_questions.extend(data['questions'])
+            else:
+                all_questions.append(data)
+            print(f"✅ Loaded questions from {file_path}")
+        except Exception as e:
+            print(f"❌ Error loading {file_path}: {e}")
+    return tuple(all_questions)
+
+def load_question_files(json_files: List[str]) -> List[Dict[str, Any]]:
+    """Load questions from JSON files, shared by every caller in the process
+    
+    The analyzer and the RAG generator read the same files; parsing them once
+    here avoids a second pass over the JSON.
+    """
+    files = tuple(json_files)
+    mtimes = tuple(os.path.getmtime(p) if os.path.exists(p) else 0.0 for p in files)
+    return list(_parse_question_files(files, mtimes))
+
+# Texts per forward pass when pre-computing embeddings
+ENCODE_BATCH_SIZE = 64
+
+# Bumped when the layout of embeddings_cache.pkl changes. Version 2 stores
+# L2-normalized float16 matrices; older caches hold raw float32 rows.
+CACHE_FORMAT_VERSION = 2
+
+def _unit_rows_float16(matrix) -> np.ndarray:
+    """Rows scaled to unit length, as one contiguous float16 matrix"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float16)
+
+@lru_cache(maxsize=4)
+def _read_cache_file(cache_file: str, mtime: float) -> Dict[str, Any]:
+    """Unpickle a cache file once per (path, mtime); mtime only invalidates the memo
+    
+    Caches written before CACHE_FORMAT_VERSION 2 are normalized here, so dot
+    products against them are still cosine similarities.
+    """
+    with open(cache_file, 'rb') as f:
+        cache_data = pickle.load(f)
+    if cache_data.get('format_version') != CACHE_FORMAT_VERSION:
+        cache_data['question_embeddings'] = _unit_rows_float16(cache_data['question_embeddings'])
+        cache_data['all_embeddings'] = _unit_rows_float16(cache_data['all_embeddings'])
+        cache_data['format_version'] = CACHE_FORMAT_VERSION
+    return cache_data
+
 class EmbeddingCache:
     def __init__(self, 
                  embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
@@ -51,12 +111,13 @@ class EmbeddingCache:
             if 'correct_answer' in q:
                 all_texts.append(q['correct_answer'])
         
-        # Create embeddings
+        # Create embeddings: unit length so cosine similarity is a plain dot
+        # product, stored as one contiguous float16 matrix per text set
         print("🔄 Creating question embeddings...")
-        question_embeddings = self.embedding_model.encode(question_texts)
+        question_embeddings = self._encode_matrix(question_texts)
         
         print("🔄 Creating all text embeddings...")
-        all_embeddings = self.embedding_model.encode(all_texts)
+        all_embeddings = self._encode_matrix(all_texts)
         
         # Cache data
         cache_data = {
@@ -66,7 +127,8 @@ class EmbeddingCache:
             'question_embeddings': question_embeddings,
             'all_embeddings': all_embeddings,
             'model_name': self.embedding_model.get_sentence_embedding_dimension(),
-            'total_questions': len(all_questions)
+            'total_questions': len(all_questions),
+            'format_version': CACHE_FORMAT_VERSION
         }
         
         # Save cache
@@ -77,6 +139,12 @@ class EmbeddingCache:
         print(f"✅ Cached embeddings to {cache_file}")
         return cache_data
     
+    def _encode_matrix(self, texts: List[str]) -> np.ndarray:
+        """Batch-encode texts into an (N, dim) float16 matrix of normalized embeddings"""
+        embeddings = self.embedding_model.encode(texts, batch_size=ENCODE_BATCH_SIZE,
+                                                 convert_to_numpy=True, normalize_embeddings=True)
+        return np.ascontiguousarray(embeddings, dtype=np.float16)
+    
     def load_cached_embeddings(self) -> Optional[Dict[str, Any]]:
         """Load cached embeddings"""
         cache_file = self.cache_dir / "embeddings_cache.pkl"
@@ -86,8 +154,8 @@ class EmbeddingCache:
             return None
         
         try:
-            with open(cache_file, 'rb') as f:
-                cache_data = pickle.load(f)
+            # Memoized: repeated loads (e.g. one per similarity query) reuse the parsed data
+            cache_data = _read_cache_file(str(cache_file), cache_file.stat().st_mtime)
             print(f"✅ Loaded cached embeddings ({cache_data['total_questions']} questions)")
             return cache_data
         except Exception as e:
@@ -112,11 +180,10 @@ class EmbeddingCache:
             return []
         
         # Create query embedding
-        query_embedding = self.embedding_model.encode([query])
+        query_embedding = self.embedding_model.encode(query, convert_to_numpy=True, normalize_embeddings=True)
         
-        # Calculate similarities
-        from sklearn.metrics.pairwise import cosine_similarity
-        similarities = cosine_similarity(query_embedding, question_embeddings)[0]
+        # Cached embeddings are normalized, so one matrix-vector product gives the cosine similarities
+        similarities = np.asarray(question_embeddings, dtype=np.float32) @ query_embedding.astype(np.float32)
         
         # Get top-k similar questions
         similar_indices = np.argsort(similarities)[::-1][:top_k]
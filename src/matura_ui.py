@@ -0,0 +1,45 @@
+"""
+Shared Streamlit helpers for the real matura apps
+"""
+from pathlib import Path
+
+import streamlit as st
+
+from .real_matura_generator import RealMaturaGenerator
+
+REAL_MATURA_TAG = '<div class="real-matura-tag">📚 Базиран на реална матура</div>'
+SOURCE_TAGS = {
+    'ai_generated': '<div class="ai-generated-tag">🤖 AI Генериран</div>',
+    'spelling': '<div class="spelling-tag">✍️ Правопис</div>',
+}
+
+@st.cache_resource
+def get_generator():
+    """Shared real matura generator, built once per server process"""
+    return RealMaturaGenerator()
+
+@st.cache_data
+def _read_stylesheet(path: str) -> str:
+    """Stylesheet contents, read from disk once per process"""
+    return Path(path).read_text(encoding='utf-8')
+
+def inject_stylesheet(path):
+    """Emit a stylesheet; it is re-emitted every run because reruns drop missing elements"""
+    st.html(f"<style>{_read_stylesheet(str(path))}</style>")
+
+def source_tag_html(source):
+    """Tag markup for a question source; anything unknown is treated as real"""
+    return SOURCE_TAGS.get(source, REAL_MATURA_TAG)
+
+def render_source_tag(source):
+    """Show the tag for a question source; st.html skips the markdown parser"""
+    st.html(source_tag_html(source))
+
+def render_answer_feedback(choice, correct_answer):
+    """Show whether the chosen option is correct; returns True if it was"""
+    if choice == correct_answer:
+        st.success("✅ Правилен отговор!")
+        return True
+    st.error("❌ Грешен отговор!")
+    st.markdown(f"**Правилният отговор е:** {correct_answer}")
+    return False
@@ -0,0 +1,27 @@
+"""
+Helpers shared by the matura parser scripts (fix_pdf_parser.py, improved_pdf_parser.py)
+"""
+import re
+
+# All answer formats in one pattern: "5. А", "5: B", "5 В ", "Въпрос 5: Г".
+# The "Въпрос" variants are covered by the dot/colon ones.
+ANSWER_RE = re.compile(r'(\d+)(?:\s*[.:]\s*|\s+(?=[А-ГA-D]\s))([А-ГA-D])')
+
+# Question numbers skipped when parsing: 14-21 need the context texts, 40-41 are open-ended
+SKIP_QUESTION_NUMBERS = frozenset({14, 15, 16, 17, 18, 19, 20, 21, 40, 41})
+
+# Answer letter (Cyrillic or Latin) -> option index
+ANSWER_LETTER_INDEX = {'А': 0, 'A': 0, 'Б': 1, 'B': 1, 'В': 2, 'C': 2, 'Г': 3, 'D': 3}
+
+def extract_answers_from_text(text):
+    """Question number -> answer letter, in one pass over the text"""
+    answers = {}
+    for question_num, answer in ANSWER_RE.findall(text):
+        answers[question_num] = answer
+    return answers
+
+def link_answers(questions, answers):
+    """Set each question's correct_answer to the option its answer letter points to"""
+    for question in questions:
+        if question['number'] in answers:
+            question['correct_answer'] = question['options'][ANSWER_LETTER_INDEX[answers[question['number']]]]
@@ -3,12 +3,64 @@ PDF Processor for extracting questions from DZI matura exams
 """
 import re
 import json
+import hashlib
+import pickle
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
 import PyPDF2
 import fitz  # PyMuPDF
 import pdfplumber
 
+from .parser_common import SKIP_QUESTION_NUMBERS, link_answers
+
+# Regexes are compiled once at import and shared by every processor instance and PDF
+ADMIN_NOTE_RE = re.compile(r'до \d+\. включително отбелязвайте в листа за отговори\.?\s*')
+MINISTRY_HEADER_RE = re.compile(r'МИНИСТЕРСТВО НА ОБРАЗОВАНИЕТО И НАУКАТА.*?ЧАСТ \d+.*?Време за работа.*?', re.DOTALL)
+ANSWER_SHEET_NOTE_RE = re.compile(r'Отговорите на задачите от \d+\. до \d+\. включително отбелязвайте в листа за отговори\.\s*')
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+CONTEXT_TEXT_1_RE = re.compile(r'ТЕКСТ 1\s*(.+?)(?=ТЕКСТ 2|$)', re.DOTALL)
+CONTEXT_TEXT_2_RE = re.compile(r'ТЕКСТ 2\s*(.+?)(?=ТЕКСТ 1|$)', re.DOTALL)
+MULTIPLE_CHOICE_BG_RE = re.compile(r'(\d+)\.\s*([^А-Г]+?)\s*А\)\s*([^\n]+?)\s*Б\)\s*([^\n]+?)\s*В\)\s*([^\n]+?)\s*Г\)\s*([^\n]+?)(?=\n\s*\d+\.|$)', re.DOTALL)
+# Applied in order; a later pattern overrides an earlier match for the same question
+ANSWER_PATTERNS = tuple(re.compile(pattern, re.MULTILINE) for pattern in (
+    r'(\d+)\s*[\.:]\s*([А-Г])\s*',
+    r'(\d+)\s*[\.:]\s*([A-D])\s*',
+    r'(\d+)\s+([А-Г])\s+',
+    r'(\d+)\s+([A-D])\s+',
+    r'Въпрос\s*(\d+)\s*[\.:]\s*([А-Г])',
+    r'Въпрос\s*(\d+)\s*[\.:]\s*([A-D])'
+))
+
+# Pages read per batch by extract_text_from_pdf_batched
+PDF_BATCH_PAGES = 50
+
+# Extracted PDF text is kept here between runs, one pickle per (path, size, mtime)
+PDF_TEXT_CACHE_DIR = Path("cache/pdf_text")
+
+def _pdf_text_cache_file(pdf_path: str, size: int, mtime_ns: int) -> Path:
+    """Disk cache location for the text of one version of a PDF"""
+    key = hashlib.blake2b(f"{pdf_path}|{size}|{mtime_ns}".encode('utf-8'), digest_size=16).hexdigest()
+    return PDF_TEXT_CACHE_DIR / f"{key}.pkl"
+
+@lru_cache(maxsize=32)
+def _cached_pdf_text(pdf_path: str, size: int, mtime_ns: int) -> str:
+    """PDF text from the disk cache, extracting and storing it on a miss"""
+    cache_file = _pdf_text_cache_file(pdf_path, size, mtime_ns)
+    try:
+        return pickle.loads(cache_file.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    
+    text = MaturaPDFProcessor.extract_text_uncached(pdf_path)
+    # Failed extractions are not stored so they are retried next time
+    if text:
+        PDF_TEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_file.with_suffix(".pkl.tmp")
+        tmp_path.write_bytes(pickle.dumps(text))
+        tmp_path.replace(cache_file)
+    return text
+
 class MaturaPDFProcessor:
     """Processor for DZI matura PDF files"""
     
@@ -26,16 +78,42 @@ class MaturaPDFProcessor:
         }
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extract text from PDF, reusing earlier extractions of the same file version"""
+        try:
+            stat = Path(pdf_path).stat()
+        except OSError:
+            return self.extract_text_uncached(pdf_path)
+        return _cached_pdf_text(str(Path(pdf_path).resolve()), stat.st_size, stat.st_mtime_ns)
+    
+    @staticmethod
+    def extract_text_from_pdf_batched(pdf_path: str, batch_pages: int = PDF_BATCH_PAGES) -> Iterator[str]:
+        """Yield the pdfplumber text of a PDF in batches of pages
+        
+        Each page's parsed layout is dropped as soon as its text is read, so
+        peak memory follows the batch size instead of the page count.
+        """
+        with pdfplumber.open(pdf_path) as pdf:
+            batch = []
+            for page_number, page in enumerate(pdf.pages, 1):
+                page_text = page.extract_text()
+                page.flush_cache()
+                if page_text:
+                    batch.append(page_text + "\n")
+                if page_number % batch_pages == 0 and batch:
+                    yield "".join(batch)
+                    batch = []
+            if batch:
+                yield "".join(batch)
+    
+    @staticmethod
+    def extract_text_uncached(pdf_path: str) -> str:
         """Extract text from PDF using multiple methods"""
         text = ""
         
         # Try pdfplumber first (best for structured text)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            for batch in MaturaPDFProcessor.extract_text_from_pdf_batched(pdf_path):
+                text += batch
         except Exception as e:
             print(f"pdfplumber failed: {e}")
         
@@ -64,12 +142,12 @@ class MaturaPDFProcessor:
     def clean_question_text(self, text: str) -> str:
         """Clean question text from administrative parts"""
         # Remove administrative parts
-        text = re.sub(r'до \d+\. включително отбелязвайте в листа за отговори\.?\s*', '', text)
-        text = re.sub(r'МИНИСТЕРСТВО НА ОБРАЗОВАНИЕТО И НАУКАТА.*?ЧАСТ \d+.*?Време за работа.*?', '', text, flags=re.DOTALL)
-        text = re.sub(r'Отговорите на задачите от \d+\. до \d+\. включително отбелязвайте в листа за отговори\.\s*', '', text)
+        text = ADMIN_NOTE_RE.sub('', text)
+        text = MINISTRY_HEADER_RE.sub('', text)
+        text = ANSWER_SHEET_NOTE_RE.sub('', text)
         
         # Clean extra newlines and spaces
-        text = re.sub(r'\n\s*\n', '\n', text)
+        text = BLANK_LINES_RE.sub('\n', text)
         text = text.strip()
         
         return text
@@ -79,12 +157,12 @@ class MaturaPDFProcessor:
         texts = {}
         
         # Find ТЕКСТ 1
-        text1_match = re.search(r'ТЕКСТ 1\s*(.+?)(?=ТЕКСТ 2|$)', text, re.DOTALL)
+        text1_match = CONTEXT_TEXT_1_RE.search(text)
         if text1_match:
             texts['text_1'] = text1_match.group(1).strip()
         
         # Find ТЕКСТ 2
-        text2_match = re.search(r'ТЕКСТ 2\s*(.+?)(?=ТЕКСТ 1|$)', text, re.DOTALL)
+        text2_match = CONTEXT_TEXT_2_RE.search(text)
         if text2_match:
             texts['text_2'] = text2_match.group(1).strip()
         
@@ -97,25 +175,14 @@ class MaturaPDFProcessor:
         # Extract context texts first
         texts = self.extract_context_texts(text)
         
-        # Improved pattern for multiple choice questions
-        improved_pattern = r'(\d+)\.\s*([^А-Г]+?)\s*А\)\s*([^\n]+?)\s*Б\)\s*([^\n]+?)\s*В\)\s*([^\n]+?)\s*Г\)\s*([^\n]+?)(?=\n\s*\d+\.|$)'
-        
         # Find multiple choice questions with Bulgarian letters
-        mc_matches = re.findall(improved_pattern, text, re.DOTALL)
+        mc_matches = MULTIPLE_CHOICE_BG_RE.findall(text)
         for match in mc_matches:
             question_num, question_text, option_a, option_b, option_c, option_d = match
             question_number = int(question_num.strip())
             
             # Skip problematic questions (context-based and open-ended)
-            if question_number in [14, 15, 16, 17, 18, 19, 20, 21, 40, 41]:
-                continue
-            
-            # Skip questions that require context texts (ТЕКСТ 1, ТЕКСТ 2)
-            if question_number in range(14, 22):
-                continue
-            
-            # Skip open-ended questions (essays and complex tasks)
-            if question_number in [40, 41]:
+            if question_number in SKIP_QUESTION_NUMBERS:
                 continue
             
             # Clean question text
@@ -150,18 +217,8 @@ class MaturaPDFProcessor:
         """Extract answers from text"""
         answers = {}
         
-        # Answer patterns
-        answer_patterns = [
-            r'(\d+)\s*[\.:]\s*([А-Г])\s*',
-            r'(\d+)\s*[\.:]\s*([A-D])\s*',
-            r'(\d+)\s+([А-Г])\s+',
-            r'(\d+)\s+([A-D])\s+',
-            r'Въпрос\s*(\d+)\s*[\.:]\s*([А-Г])',
-            r'Въпрос\s*(\d+)\s*[\.:]\s*([A-D])'
-        ]
-        
-        for pattern in answer_patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
+        for pattern in ANSWER_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 question_num, answer = match
                 answers[question_num.strip()] = answer.strip()
@@ -187,18 +244,7 @@ class MaturaPDFProcessor:
         answers = self.extract_answers(text)
         
         # Link questions with answers
-        for question in questions:
-            if question['number'] in answers:
-                answer = answers[question['number']]
-                # Map letters to options
-                if answer in ['А', 'A']:
-                    question['correct_answer'] = question['options'][0]
-                elif answer in ['Б', 'B']:
-                    question['correct_answer'] = question['options'][1]
-                elif answer in ['В', 'C']:
-                    question['correct_answer'] = question['options'][2]
-                elif answer in ['Г', 'D']:
-                    question['correct_answer'] = question['options'][3]
+        link_answers(questions, answers)
         
         # Extract metadata
         metadata = {
@@ -38,6 +38,16 @@ class Question:
     options: Optional[List[str]] = None
     correct_answer: Optional[str] = None
     explanation: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Question":
+        """Rebuild a question from its JSON form (enums stored as their values)"""
+        return cls(**{
+            **data,
+            'question_type': QuestionType(data['question_type']),
+            'subject_area': SubjectArea(data['subject_area']),
+            'topic': Topic(data['topic']),
+        })
 
 class DZIQuestionGenerator:
     """Generator for DZI questions in Bulgarian Language and Literature"""
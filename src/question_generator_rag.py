@@ -7,14 +7,26 @@ import json
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import openai
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 import re
+from functools import lru_cache
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import os
-from .embedding_cache import EmbeddingCache
+from .embedding_cache import EmbeddingCache, load_question_files
+
+# Upper bound on concurrent LLM requests per generate_question_variants call
+MAX_LLM_WORKERS = 4
+
+# Patterns for parsing the LLM output, compiled once at import; the per-letter
+# option patterns used to be rebuilt from an f-string for every parsed question
+GENERATED_QUESTION_RE = re.compile(r'ВЪПРОС:\s*(.+?)(?=\n[A-D]\)|$)', re.DOTALL)
+GENERATED_OPTION_RES = tuple(re.compile(rf'{letter}\)\s*(.+?)(?=\n[^A-D]|$)', re.DOTALL) for letter in 'ABCD')
+GENERATED_ANSWER_RE = re.compile(r'ВЕРЕН_ОТГОВОР:\s*([A-D])')
+GENERATED_EXPLANATION_RE = re.compile(r'ОБЯСНЕНИЕ:\s*(.+?)(?=\n|$)', re.DOTALL)
+GENERATED_TOPIC_RE = re.compile(r'ТЕМА:\s*(.+?)(?=\n|$)', re.DOTALL)
 
 @dataclass
 class GeneratedQuestion:
@@ -54,6 +66,10 @@ class RAGQuestionGenerator:
         self.embeddings = None
         self.question_embeddings = None
         self.cache_data = None
+        self._search_index = None
+        self._search_index_source = None
+        self._encode_query = lru_cache(maxsize=1024)(self._encode_query_uncached)
+        self._validate_cached = lru_cache(maxsize=1024)(self._validate_question_quality)
         
     def load_real_questions(self, json_files: List[str]) -> None:
         """Load real matura questions from JSON files"""
@@ -68,22 +84,11 @@ class RAGQuestionGenerator:
                 return
         
         # Fallback: load from JSON files
-        all_questions = []
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        all_questions.extend(data)
-                    elif isinstance(data, dict) and 'questions' in data:
-                        all_questions.extend(data['questions'])
-                    else:
-                        all_questions.append(data)
-                print(f"✅ Loaded questions from {file_path}")
-            except Exception as e:
-                print(f"❌ Error loading {file_path}: {e}")
+        all_questions = load_question_files(json_files)
         
         self.questions = all_questions
+        self.question_embeddings = None
+        self.embeddings = None
         print(f"📊 Total loaded: {len(self.questions)} questions")
         
     def create_embeddings(self) -> None:
@@ -95,40 +100,66 @@ class RAGQuestionGenerator:
         print("🔄 Creating embeddings...")
         
         # Create embeddings for questions only
-        question_texts = [q.get('question', '') for q in self.questions]
-        self.question_embeddings = self.embedding_model.encode(question_texts)
-        
-        # Create embeddings for all texts (questions + answers)
-        all_texts = []
-        for q in self.questions:
-            all_texts.append(q.get('question', ''))
-            if q.get('type') == 'multiple_choice' and 'options' in q:
-                all_texts.extend(q['options'])
-            if 'correct_answer' in q:
-                all_texts.append(q['correct_answer'])
-        
-        self.embeddings = self.embedding_model.encode(all_texts)
+        if self.question_embeddings is None:
+            question_texts = [q.get('question', '') for q in self.questions]
+            self.question_embeddings = self.embedding_model.encode(question_texts)
+        
+        # Create embeddings for all texts (questions + answers), unless shared by the analyzer
+        if self.embeddings is None:
+            all_texts = []
+            for q in self.questions:
+                all_texts.append(q.get('question', ''))
+                if q.get('type') == 'multiple_choice' and 'options' in q:
+                    all_texts.extend(q['options'])
+                if 'correct_answer' in q:
+                    all_texts.append(q['correct_answer'])
+            
+            self.embeddings = self.embedding_model.encode(all_texts)
         print(f"✅ Created embeddings for {len(self.question_embeddings)} questions")
+    
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        """Normalized float32 embedding for a single query string"""
+        embedding = self.embedding_model.encode(query, convert_to_numpy=True, normalize_embeddings=True)
+        embedding = embedding.astype(np.float32)
+        # Cached arrays are shared between callers, so keep them read-only
+        embedding.setflags(write=False)
+        return embedding
+    
+    def _get_search_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """L2-normalized question embeddings quantized to int8 with a per-row scale"""
+        if self._search_index is None or self._search_index_source is not self.question_embeddings:
+            matrix = np.asarray(self.question_embeddings, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+            scale = np.abs(matrix).max(axis=1, keepdims=True) / 127
+            scale[scale == 0] = 1.0
+            quantized = np.ascontiguousarray(np.round(matrix / scale).astype(np.int8))
+            self._search_index = (quantized, scale.ravel().astype(np.float32))
+            self._search_index_source = self.question_embeddings
+        return self._search_index
         
     def find_similar_questions(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
         """Find similar questions using cosine similarity"""
         if self.question_embeddings is None:
             raise ValueError("Embeddings not created. Call create_embeddings() first.")
         
-        # Create embedding for query
-        query_embedding = self.embedding_model.encode([query])
+        index, scale = self._get_search_index()
         
-        # Calculate similarities
-        similarities = cosine_similarity(query_embedding, self.question_embeddings)[0]
+        # Normalized query embedding, memoized for repeated queries
+        query_embedding = self._encode_query(query)
         
-        # Get top-k similar questions
-        similar_indices = np.argsort(similarities)[::-1][:top_k]
+        # Cosine similarity against the int8 index, rescaled per question
+        similarities = (index @ query_embedding) * scale
         
-        results = []
-        for idx in similar_indices:
-            results.append((idx, similarities[idx]))
+        # Get top-k similar questions without sorting the whole array
+        top_k = min(top_k, len(similarities))
+        if top_k <= 0:
+            return []
+        similar_indices = np.argpartition(-similarities, top_k - 1)[:top_k]
+        similar_indices = similar_indices[np.argsort(-similarities[similar_indices])]
         
-        return results
+        return [(idx, similarities[idx]) for idx in similar_indices]
     
     def generate_question_variants(self, 
                                  base_question: str, 
@@ -151,19 +182,25 @@ class RAGQuestionGenerator:
                 'similarity': similarity
             })
         
-        # Generate variants using LLM
-        variants = []
-        for i in range(num_variants):
-            variant = self._generate_single_variant(
-                base_question, 
-                context_questions, 
-                difficulty,
-                variant_number=i+1
-            )
-            if variant:
-                variants.append(variant)
+        # Generate variants using LLM; the calls are independent and network-bound,
+        # so they run concurrently and wall-clock time is roughly one LLM round-trip
+        if num_variants <= 0:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_LLM_WORKERS, num_variants)) as executor:
+            futures = [
+                executor.submit(
+                    self._generate_single_variant,
+                    base_question,
+                    context_questions,
+                    difficulty,
+                    variant_number=i+1
+                )
+                for i in range(num_variants)
+            ]
+            variants = [future.result() for future in futures]
         
-        return variants
+        return [variant for variant in variants if variant]
     
     def _generate_single_variant(self, 
                                 base_question: str, 
@@ -247,7 +284,7 @@ D) [вариант 4]
         
         try:
             # Extract question
-            question_match = re.search(r'ВЪПРОС:\s*(.+?)(?=\n[A-D]\)|$)', generated_text, re.DOTALL)
+            question_match = GENERATED_QUESTION_RE.search(generated_text)
             if not question_match:
                 return None
             
@@ -255,8 +292,8 @@ D) [вариант 4]
             
             # Extract options
             options = []
-            for letter in ['A', 'B', 'C', 'D']:
-                option_match = re.search(rf'{letter}\)\s*(.+?)(?=\n[^A-D]|$)', generated_text, re.DOTALL)
+            for option_re in GENERATED_OPTION_RES:
+                option_match = option_re.search(generated_text)
                 if option_match:
                     options.append(option_match.group(1).strip())
             
@@ -264,18 +301,18 @@ D) [вариант 4]
                 return None
             
             # Extract correct answer
-            correct_match = re.search(r'ВЕРЕН_ОТГОВОР:\s*([A-D])', generated_text)
+            correct_match = GENERATED_ANSWER_RE.search(generated_text)
             if not correct_match:
                 return None
             
             correct_answer = correct_match.group(1)
             
             # Extract explanation
-            explanation_match = re.search(r'ОБЯСНЕНИЕ:\s*(.+?)(?=\n|$)', generated_text, re.DOTALL)
+            explanation_match = GENERATED_EXPLANATION_RE.search(generated_text)
             explanation = explanation_match.group(1).strip() if explanation_match else ""
             
             # Extract topic
-            topic_match = re.search(r'ТЕМА:\s*(.+?)(?=\n|$)', generated_text, re.DOTALL)
+            topic_match = GENERATED_TOPIC_RE.search(generated_text)
             topic = topic_match.group(1).strip() if topic_match else "general"
             
             # Get source question indices
@@ -324,7 +361,18 @@ D) [вариант 4]
         return generated_questions
     
     def validate_question_quality(self, question: GeneratedQuestion) -> Dict[str, Any]:
-        """Validate the quality of a generated question"""
+        """Validate the quality of a generated question
+        
+        Results are memoized (bounded LRU) on the question content, so
+        re-validating the same question (e.g. on every UI rerun) is a lookup.
+        """
+        cached = self._validate_cached(question.question, tuple(question.options), question.correct_answer)
+        
+        # Copy so callers can't mutate the cached result
+        return {**cached, 'issues': list(cached['issues'])}
+    
+    def _validate_question_quality(self, question_text: str, options: Tuple[str, ...], correct_answer: str) -> Dict[str, Any]:
+        """Run the validation checks for a single question's content"""
         
         validation = {
             'is_valid': True,
@@ -333,34 +381,34 @@ D) [вариант 4]
         }
         
         # Check question length
-        if len(question.question.split()) < 5:
+        if len(question_text.split()) < 5:
             validation['issues'].append("Question too short")
             validation['is_valid'] = False
         
         # Check options count
-        if len(question.options) != 4:
+        if len(options) != 4:
             validation['issues'].append("Incorrect number of options")
             validation['is_valid'] = False
         
         # Check correct answer format
-        if question.correct_answer not in ['A', 'B', 'C', 'D']:
+        if correct_answer not in ['A', 'B', 'C', 'D']:
             validation['issues'].append("Invalid correct answer format")
             validation['is_valid'] = False
         
         # Check for duplicate options
-        if len(set(question.options)) != len(question.options):
+        if len(set(options)) != len(options):
             validation['issues'].append("Duplicate options found")
             validation['is_valid'] = False
         
         # Calculate quality score
         score = 0.0
-        if len(question.question.split()) >= 5:
+        if len(question_text.split()) >= 5:
             score += 0.3
-        if len(question.options) == 4:
+        if len(options) == 4:
             score += 0.3
-        if question.correct_answer in ['A', 'B', 'C', 'D']:
+        if correct_answer in ['A', 'B', 'C', 'D']:
             score += 0.2
-        if len(set(question.options)) == len(question.options):
+        if len(set(options)) == len(options):
             score += 0.2
         
         validation['score'] = score
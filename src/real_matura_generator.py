@@ -36,6 +36,7 @@ class RealMaturaGenerator:
     
     def __init__(self):
         self.questions_data = []
+        self._by_subject = {}
         self.load_real_questions()
     
     def load_real_questions(self):
@@ -56,13 +57,21 @@ class RealMaturaGenerator:
                 print(f"Loaded {len(questions2)} questions from matura_2025_avgust.json")
             
             print(f"Total loaded: {len(self.questions_data)} real matura questions")
+            self._index_by_subject()
             return self.questions_data
             
         except Exception as e:
             print(f"Error loading real questions: {e}")
             self.questions_data = []
+            self._by_subject = {}
             return []
     
+    def _index_by_subject(self) -> None:
+        """Bucket the raw question data by subject once, after loading"""
+        self._by_subject = {}
+        for real_question in self.questions_data:
+            self._by_subject.setdefault(real_question.get('subject'), []).append(real_question)
+    
     def convert_real_question(self, real_question: Dict[str, Any]) -> Question:
         """Convert real question data to Question object"""
         # Generate unique ID
@@ -111,15 +120,12 @@ class RealMaturaGenerator:
         
         return questions
     
-    def get_questions_by_subject(self, subject: SubjectArea) -> List[Question]:
-        """Get questions filtered by subject"""
-        filtered_questions = []
-        for real_question in self.questions_data:
-            if real_question.get('subject') == subject.value:
-                question = self.convert_real_question(real_question)
-                filtered_questions.append(question)
-        
-        return filtered_questions
+    def get_questions_by_subject(self, subject: SubjectArea, limit: int = None) -> List[Question]:
+        """Get questions filtered by subject, converting at most limit of them"""
+        bucket = self._by_subject.get(subject.value, [])
+        if limit is not None:
+            bucket = bucket[:limit]
+        return [self.convert_real_question(real_question) for real_question in bucket]
     
     def get_all_questions(self) -> List[Question]:
         """Get all available real questions"""
@@ -5,15 +5,17 @@ Phase 1: Foundation - Vectorize and analyze real questions
 
 import json
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Any, Tuple
 from collections import Counter, defaultdict
 import re
+from functools import lru_cache
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import KMeans
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+try:
+    from .embedding_cache import load_question_files
+except ImportError:
+    from embedding_cache import load_question_files
 
 class MaturaVectorAnalyzer:
     def __init__(self, embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
@@ -22,35 +24,13 @@ class MaturaVectorAnalyzer:
         self.questions = []
         self.embeddings = None
         self.analysis_results = {}
+        self._search_index = None
+        self._search_index_source = None
+        self._encode_query = lru_cache(maxsize=1024)(self._encode_query_uncached)
         
     def load_real_questions(self, json_files: List[str]) -> None:
         """Load real matura questions from JSON files"""
-        all_questions = []
-        
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # Handle different JSON structures
-                    if isinstance(data, list):
-                        all_questions.extend(data)
-                        print(f"✅ Loaded {len(data)} questions from {file_path}")
-                    elif isinstance(data, dict):
-                        # Check if it has a 'questions' key
-                        if 'questions' in data:
-                            questions = data['questions']
-                            all_questions.extend(questions)
-                            print(f"✅ Loaded {len(questions)} questions from {file_path}")
-                        else:
-                            # Single question object
-                            all_questions.append(data)
-                            print(f"✅ Loaded 1 question from {file_path}")
-                    else:
-                        all_questions.append(data)
-                        print(f"✅ Loaded 1 question from {file_path}")
-            except Exception as e:
-                print(f"❌ Error loading {file_path}: {e}")
+        all_questions = load_question_files(json_files)
         
         self.questions = all_questions
         print(f"📊 Total loaded: {len(self.questions)} questions")
@@ -83,7 +63,7 @@ class MaturaVectorAnalyzer:
         
         analysis = {
             'total_questions': len(self.questions),
-            'question_types': Counter([q.get('type', 'unknown') for q in self.questions]),
+            'question_types': Counter(),
             'question_lengths': [],
             'answer_lengths': [],
             'topics': [],
@@ -92,9 +72,15 @@ class MaturaVectorAnalyzer:
             'question_structures': []
         }
         
+        # Single pass over the questions; every statistic is accumulated here
+        topic_counts = Counter()
+        structure_counts = Counter()
         for q in self.questions:
+            analysis['question_types'][q.get('type', 'unknown')] += 1
+            
             # Question length analysis
             question_text = q.get('question', '')
+            lowered_text = question_text.lower()
             analysis['question_lengths'].append(len(question_text.split()))
             
             # Answer length analysis
@@ -103,44 +89,46 @@ class MaturaVectorAnalyzer:
                 analysis['answer_lengths'].append(len(answer_text.split()))
             
             # Topic analysis (extract from question text)
-            topics = self._extract_topics(question_text)
+            topics = self._extract_topics(lowered_text)
             analysis['topics'].extend(topics)
+            topic_counts.update(topics)
             
             # Common words analysis
-            words = re.findall(r'\b\w+\b', question_text.lower())
+            words = re.findall(r'\b\w+\b', lowered_text)
             analysis['common_words'].update(words)
             
             # Question structure analysis
             structure = self._analyze_question_structure(question_text)
             analysis['question_structures'].append(structure)
+            structure_counts[structure] += 1
         
         # Calculate statistics
         analysis['avg_question_length'] = np.mean(analysis['question_lengths'])
         analysis['avg_answer_length'] = np.mean(analysis['answer_lengths'])
-        analysis['most_common_topics'] = Counter(analysis['topics']).most_common(10)
+        analysis['most_common_topics'] = topic_counts.most_common(10)
         analysis['most_common_words'] = analysis['common_words'].most_common(20)
-        analysis['structure_patterns'] = Counter(analysis['question_structures'])
+        analysis['structure_patterns'] = structure_counts
         
         self.analysis_results = analysis
         return analysis
     
     def _extract_topics(self, text: str) -> List[str]:
-        """Extract topics from question text"""
+        """Extract topics from already lowercased question text"""
         topics = []
         
         # Literature topics
         literature_keywords = ['автор', 'произведение', 'роман', 'разказ', 'поезия', 'стихотворение', 'герой', 'персонаж']
-        if any(keyword in text.lower() for keyword in literature_keywords):
+        if any(keyword in text for keyword in literature_keywords):
             topics.append('literature')
         
         # Language topics
         language_keywords = ['език', 'граматика', 'правопис', 'синтаксис', 'морфология', 'фонетика']
-        if any(keyword in text.lower() for keyword in language_keywords):
+        if any(keyword in text for keyword in language_keywords):
             topics.append('language')
         
         # Analysis topics
         analysis_keywords = ['анализ', 'интерпретация', 'значение', 'смисъл', 'тема', 'идея']
-        if any(keyword in text.lower() for keyword in analysis_keywords):
+        if any(keyword in text for keyword in analysis_keywords):
             topics.append('analysis')
         
         return topics
@@ -160,19 +148,43 @@ class MaturaVectorAnalyzer:
         else:
             return 'statement'
     
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        """Normalized float32 embedding for a single query string"""
+        embedding = self.embedding_model.encode(query, convert_to_numpy=True, normalize_embeddings=True)
+        embedding = embedding.astype(np.float32)
+        # Cached arrays are shared between callers, so keep them read-only
+        embedding.setflags(write=False)
+        return embedding
+    
+    def _get_search_index(self) -> np.ndarray:
+        """L2-normalized embeddings, built once and reused by every query"""
+        if self._search_index is None or self._search_index_source is not self.embeddings:
+            matrix = np.asarray(self.embeddings, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._search_index = np.ascontiguousarray(matrix / norms)
+            self._search_index_source = self.embeddings
+        return self._search_index
+    
     def find_similar_questions(self, query_text: str, top_k: int = 5) -> List[Tuple[int, float]]:
         """Find similar questions using cosine similarity"""
         if self.embeddings is None:
             raise ValueError("Embeddings not created. Call create_embeddings() first.")
         
-        # Create embedding for query
-        query_embedding = self.embedding_model.encode([query_text])
+        index = self._get_search_index()
+        
+        # Normalized query embedding, memoized for repeated queries
+        query_embedding = self._encode_query(query_text)
         
-        # Calculate similarities
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
+        # Cosine similarity is a single dot product against the normalized index
+        similarities = index @ query_embedding
         
-        # Get top-k similar questions
-        similar_indices = np.argsort(similarities)[::-1][:top_k]
+        # Get top-k similar questions without sorting the whole array
+        top_k = min(top_k, len(similarities))
+        if top_k <= 0:
+            return []
+        similar_indices = np.argpartition(-similarities, top_k - 1)[:top_k]
+        similar_indices = similar_indices[np.argsort(-similarities[similar_indices])]
         
         results = []
         for idx in similar_indices: